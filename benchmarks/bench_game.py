@@ -0,0 +1,174 @@
+"""
+Benchmarks for the game loop of Space Rocks.
+
+Every scene is built from a fixed seed with a given number of asteroids & bullets, then the game runs for a number of
+frames & the physics, collision, draw & particle update stages are timed separately with the FrameProfiler. Results are
+reported as frames per second & microseconds per entity for each stage & can be written to a JSON file, which makes it
+possible to compare two runs (for example two commits) with --compare.
+
+SDL's dummy video & audio drivers are used, so no window is opened & no sound is played.
+
+Run it from the root of the repository:
+
+    python benchmarks/bench_game.py --asteroids 10,100,1000 --bullets 0,100 --output results.json
+    python benchmarks/bench_game.py --output new.json --compare results.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+sys.path.insert(0, os.path.join(ROOT, "game"))
+
+import pygame  # noqa: E402
+from pygame.math import Vector2  # noqa: E402
+
+from space_rocks import SpaceRocks  # noqa: E402
+from utils.game_utils import get_random_position, get_random_velocity  # noqa: E402
+from utils.profile_utils import FrameProfiler  # noqa: E402
+
+# stage name to the profiler sections it is made of
+STAGES = {
+    "physics": ("physics",),
+    "collision": ("collisions",),
+    "draw": ("blit", "display"),
+    "particles": ("particles",),
+}
+
+
+def build_scene(asteroids, bullets, seed, **game_options):
+    """
+    Creates a game with the given number of asteroids & bullets, placed & moving randomly based on the seed
+    """
+    # no waiting on the clock, the benchmark measures how fast a frame can be produced
+    game = SpaceRocks(seed=seed, render_fps=0, **game_options)
+
+    for asteroid in game.asteroids[:]:
+        game._remove_from_world([asteroid])
+    game.asteroids.clear()
+
+    rng = game.random
+    for _ in range(asteroids):
+        game._add_asteroid(game._create_asteroid(get_random_position(game.field, rng), get_random_velocity(1, 3, rng)))
+
+    for _ in range(bullets):
+        velocity = Vector2(rng.uniform(-1, 1), rng.uniform(-1, 1))
+        game._add_bullet(game._create_bullet(get_random_position(game.field, rng), velocity))
+
+    return game
+
+
+def run_scene(asteroids, bullets, frames, seed, world=False):
+    game_options = {}
+    if world:
+        from models.world import World
+        game_options["world"] = World()
+
+    profiler = FrameProfiler(history=frames)
+    game = build_scene(asteroids, bullets, seed, profiler=profiler, **game_options)
+    entities = max(1, asteroids + bullets)
+
+    for _ in range(frames):
+        game._game_engine()
+        game._draw()
+
+    summary = profiler.summary()
+    result = {
+        "scene": f"{asteroids}x{bullets}{'-world' if world else ''}",
+        "asteroids": asteroids,
+        "bullets": bullets,
+        "world": world,
+        "frames": frames,
+        "seed": seed,
+    }
+
+    total_ms = 0.0
+    for stage, sections in STAGES.items():
+        stage_ms = sum(summary[section]["mean_ms"] for section in sections if section in summary)
+        total_ms += stage_ms
+        result[f"{stage}_us_per_entity"] = stage_ms * 1000 / entities
+        result[f"{stage}_fps"] = 1000 / stage_ms if stage_ms else float("inf")
+
+    result["fps"] = 1000 / total_ms if total_ms else float("inf")
+    return result
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline):
+    """
+    Prints the frames per second of every scene & stage relative to a baseline run
+    """
+    baseline_scenes = {result["scene"]: result for result in baseline["results"]}
+    print(f"\ncompared to {baseline.get('commit') or 'baseline'} (higher is faster)")
+
+    for result in results:
+        old = baseline_scenes.get(result["scene"])
+        if old is None:
+            continue
+        ratios = [
+            f"{key[:-4]} {result[key] / old[key]:.2f}x"
+            for key in ["fps"] + [f"{stage}_fps" for stage in STAGES]
+            if old.get(key)
+        ]
+        print(f"{result['scene']:>16}: " + ", ".join(ratios))
+
+
+def parse_counts(value):
+    return [int(count) for count in value.split(",")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--asteroids", type=parse_counts, default=[10, 100, 1000],
+                        help="comma separated numbers of asteroids")
+    parser.add_argument("--bullets", type=parse_counts, default=[0, 100], help="comma separated numbers of bullets")
+    parser.add_argument("--frames", type=int, default=200, help="frames simulated per scene")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--world", action="store_true", help="also run every scene with the numpy backed World")
+    parser.add_argument("--output", help="JSON file the results are written to")
+    parser.add_argument("--compare", help="JSON file of an earlier run to compare the results with")
+    args = parser.parse_args()
+
+    # asset paths are relative to the root of the repository
+    os.chdir(ROOT)
+
+    results = []
+    for asteroids in args.asteroids:
+        for bullets in args.bullets:
+            for world in ([False, True] if args.world else [False]):
+                result = run_scene(asteroids, bullets, args.frames, args.seed, world)
+                results.append(result)
+                print(f"{result['scene']:>16}: {result['fps']:9.1f} fps | " + " | ".join(
+                    f"{stage} {result[f'{stage}_us_per_entity']:7.2f} us/entity" for stage in STAGES))
+
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(report, output_file, indent=2)
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            compare(results, json.load(baseline_file))
+
+
+if __name__ == "__main__":
+    main()
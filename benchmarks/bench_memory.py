@@ -0,0 +1,145 @@
+"""
+Memory benchmark for the game objects of Space Rocks.
+
+Creates a given number of asteroids & bullets in a headless game & measures how much memory they take with tracemalloc,
+reported in bytes per entity. Everything allocated while creating them is counted: the objects themselves, their
+vectors & anything else they hold on to. With --world the objects are attached to the numpy backed World, in which
+case the arrays of the world are counted as well.
+
+Results can be written to a JSON file & compared with an earlier run, for example one from another commit:
+
+    python benchmarks/bench_memory.py --count 10000 --world --output results.json
+    python benchmarks/bench_memory.py --world --output new.json --compare results.json
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+sys.path.insert(0, os.path.join(ROOT, "game"))
+
+import pygame  # noqa: E402
+from pygame.math import Vector2  # noqa: E402
+
+from space_rocks import SpaceRocks  # noqa: E402
+from utils.game_utils import get_random_position, get_random_velocity  # noqa: E402
+
+KINDS = ("asteroid", "bullet")
+
+
+def measure(kind, count, seed, world=False):
+    """
+    :returns: the number of bytes allocated per entity to create count entities of the given kind
+    """
+    game_options = {}
+    if world:
+        from models.world import World
+        # the arrays are grown up front, so their growth does not get counted as per entity memory
+        game_options["world"] = World(capacity=count + 16)
+
+    game = SpaceRocks(headless=True, seed=seed, **game_options)
+    rng = game.random
+    # positions & velocities are made beforehand, only what the game objects allocate themselves is measured
+    if kind == "asteroid":
+        arguments = [(get_random_position(game.field, rng), get_random_velocity(1, 3, rng)) for _ in range(count)]
+        create, add = game._create_asteroid, game._add_asteroid
+    else:
+        arguments = [(get_random_position(game.field, rng), Vector2(rng.uniform(-1, 1), rng.uniform(-1, 1)))
+                     for _ in range(count)]
+        create, add = game._create_bullet, game._add_bullet
+
+    entities = []
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+
+    for position, velocity in arguments:
+        entity = create(position, velocity)
+        if world:
+            add(entity)
+        else:
+            entities.append(entity)
+
+    allocated = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    # the list holding on to the entities is not part of their size
+    held = sys.getsizeof(entities) if not world else 0
+    return {
+        "scene": f"{kind}{'-world' if world else ''}",
+        "kind": kind,
+        "world": world,
+        "count": count,
+        "bytes_per_entity": (allocated - held) / count,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline):
+    """
+    Prints the memory used per entity of every scene relative to a baseline run
+    """
+    baseline_scenes = {result["scene"]: result for result in baseline["results"]}
+    print(f"\ncompared to {baseline.get('commit') or 'baseline'} (lower is smaller)")
+
+    for result in results:
+        old = baseline_scenes.get(result["scene"])
+        if old is None or not old["bytes_per_entity"]:
+            continue
+        old_bytes, new_bytes = old["bytes_per_entity"], result["bytes_per_entity"]
+        print(f"{result['scene']:>16}: {old_bytes:7.1f} -> {new_bytes:7.1f} bytes/entity "
+              f"({new_bytes / old_bytes:.2f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=10_000, help="number of entities created per scene")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--world", action="store_true", help="also measure entities attached to the numpy World")
+    parser.add_argument("--output", help="JSON file the results are written to")
+    parser.add_argument("--compare", help="JSON file of an earlier run to compare the results with")
+    args = parser.parse_args()
+
+    # asset paths are relative to the root of the repository
+    os.chdir(ROOT)
+
+    results = []
+    for kind in KINDS:
+        for world in ([False, True] if args.world else [False]):
+            result = measure(kind, args.count, args.seed, world)
+            results.append(result)
+            print(f"{result['scene']:>16}: {result['bytes_per_entity']:7.1f} bytes/entity")
+
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(report, output_file, indent=2)
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            compare(results, json.load(baseline_file))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,50 @@
+import argparse
+
 from space_rocks import SpaceRocks
+from replay import RecordingInput
+from utils.input_utils import KeyboardInput
+from utils.profile_utils import FrameProfiler
+
+
+def field_size(value):
+    try:
+        width, height = (int(size) for size in value.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected WIDTHxHEIGHT, got {value!r}")
+
+    # the camera can't show more than the whole play field
+    screen_width, screen_height = SpaceRocks.SCREEN_SIZE
+    if width < screen_width or height < screen_height:
+        raise argparse.ArgumentTypeError("the play field can't be smaller than the screen, "
+                                         f"{screen_width}x{screen_height}")
+    return width, height
 
 
 if __name__ == "__main__":
-    space_rocks = SpaceRocks()
+    parser = argparse.ArgumentParser(description="Space Rocks")
+    parser.add_argument("--seed", type=int, default=None, help="seed of the game, random by default")
+    parser.add_argument("--record", metavar="PATH", help="records the game to a replay file, see game/replay.py")
+    parser.add_argument("--mute", action="store_true", help="plays the game without sound")
+    parser.add_argument("--field-size", type=field_size, default=None, metavar="WIDTHxHEIGHT",
+                        help="size of the play field, larger than the screen the camera follows the spaceship")
+    parser.add_argument("--profile", metavar="PATH",
+                        help="times every phase of a frame & writes the timings to PATH when quitting, as CSV if it "
+                             "ends with .csv & JSON otherwise")
+    parser.add_argument("--profile-overlay", action="store_true", help="draws the timings over the game")
+    args = parser.parse_args()
+    if args.record and args.field_size:
+        # replays only store the seed of the game, they are always played back on a play field the size of the screen
+        parser.error("--record can't be used with --field-size")
+
+    game_options = {"seed": args.seed, "mute": args.mute, "field_size": args.field_size}
+    if args.profile or args.profile_overlay:
+        game_options["profiler"] = FrameProfiler(export_path=args.profile, overlay=args.profile_overlay)
+
+    if args.record:
+        recording = RecordingInput(KeyboardInput(), args.record, snapshot_interval=600)
+        space_rocks = SpaceRocks(input_source=recording, **game_options)
+        recording.game = space_rocks
+    else:
+        space_rocks = SpaceRocks(**game_options)
+
     space_rocks.start_game()
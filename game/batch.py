@@ -0,0 +1,140 @@
+"""
+Runs lots of independent headless games in parallel, for example to evaluate how well a bot plays.
+
+Every episode is a headless SpaceRocks game with its own seed, run in a pool of worker processes. Only a few episodes
+per worker are submitted at a time, so a worker crashing only loses the episodes that were in flight. Those are run
+again one at a time in a fresh pool, which finds out which one of them crashed: only that episode is retried & reported
+as crashed once it has used up its retries. Results are streamed back as soon as each episode finishes.
+
+    python game/batch.py --episodes 1000 --workers 8
+"""
+import argparse
+import os
+from collections import deque, namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from time import perf_counter
+
+from space_rocks import SpaceRocks
+from utils.input_utils import PolicyInput
+
+# Result of a single episode. error is None, unless the episode raised an exception or kept crashing its worker
+EpisodeResult = namedtuple("EpisodeResult", ["seed", "frames", "asteroids_destroyed", "message", "error"])
+
+# number of episodes submitted per worker at a time, enough to keep the workers busy
+IN_FLIGHT_PER_WORKER = 2
+
+
+def _init_worker():
+    # headless games never open a window or play a sound, but make sure SDL never tries to either
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+
+def run_episode(seed, max_frames, policy=None):
+    """
+    Plays a single headless game.
+    :param seed: seed of the game
+    :param max_frames: the episode ends after this many frames if the game has not been won or lost before
+    :param policy: called with the game every frame, returns the bitmask of actions to take (see utils.input_utils).
+    Must be picklable, a function defined at the top level of a module for example. Without a policy nothing is done
+    :returns: EpisodeResult
+    """
+    try:
+        game = SpaceRocks(headless=True, seed=seed)
+        if policy is not None:
+            game.input_source = PolicyInput(policy, game)
+
+        result = game.simulate(max_frames)
+        return EpisodeResult(seed=seed, frames=result.frames, asteroids_destroyed=game.asteroids_destroyed,
+                             message=result.message, error=None)
+    except Exception as error:
+        return EpisodeResult(seed=seed, frames=0, asteroids_destroyed=0, message="", error=repr(error))
+
+
+def run_batch(seeds, max_frames=10_000, policy=None, workers=None, max_retries=2):
+    """
+    Runs an episode per seed in a pool of worker processes & yields their EpisodeResult as they finish, in no particular
+    order.
+    :param seeds: seeds of the episodes to run
+    :param max_frames: maximum number of frames per episode
+    :param policy: see run_episode
+    :param workers: number of worker processes, defaults to the number of CPUs
+    :param max_retries: number of times an episode that crashed its worker is run again, after that it is reported with
+    an error. Episodes that were only running alongside it are not held against it
+    """
+    workers = workers or os.cpu_count() or 1
+    pending = deque(seeds)
+    # episodes that were in flight when a worker crashed, run again one at a time
+    suspects = deque()
+    crashes = {}
+
+    while pending or suspects:
+        if suspects:
+            # alone in the pool, a crash can only be caused by the episode that is running
+            queue, workers_in_pool, in_flight_limit = suspects, 1, 1
+        else:
+            queue, workers_in_pool, in_flight_limit = pending, workers, IN_FLIGHT_PER_WORKER * workers
+        running = {}
+
+        try:
+            with ProcessPoolExecutor(max_workers=workers_in_pool, initializer=_init_worker) as executor:
+                while queue or running:
+                    while queue and len(running) < in_flight_limit:
+                        seed = queue.popleft()
+                        running[executor.submit(run_episode, seed, max_frames, policy)] = seed
+
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    broken = False
+                    for future in done:
+                        # the futures of a broken pool stay in running, they are the episodes that were lost
+                        if isinstance(future.exception(), BrokenProcessPool):
+                            broken = True
+                            continue
+                        del running[future]
+                        yield future.result()
+
+                    if broken:
+                        raise BrokenProcessPool("a worker process crashed")
+        except BrokenProcessPool:
+            lost = list(running.values())
+            if len(lost) > 1:
+                # any of them could have crashed the worker
+                suspects.extend(lost)
+                continue
+
+            seed = lost[0]
+            crashes[seed] = crashes.get(seed, 0) + 1
+            if crashes[seed] > max_retries:
+                yield EpisodeResult(seed=seed, frames=0, asteroids_destroyed=0, message="",
+                                    error="worker process crashed")
+            else:
+                suspects.append(seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--episodes", type=int, default=100)
+    parser.add_argument("--first-seed", type=int, default=0)
+    parser.add_argument("--max-frames", type=int, default=10_000)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    start = perf_counter()
+    frames = 0
+    outcomes = {}
+    seeds = range(args.first_seed, args.first_seed + args.episodes)
+
+    for result in run_batch(seeds, args.max_frames, workers=args.workers):
+        frames += result.frames
+        outcome = result.error or result.message or "unfinished"
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+
+    elapsed = perf_counter() - start
+    print(f"{args.episodes} episodes, {frames} frames in {elapsed:.2f}s ({frames / elapsed:.0f} frames per second)")
+    for outcome, count in sorted(outcomes.items()):
+        print(f"{outcome}: {count}")
+
+
+if __name__ == "__main__":
+    main()
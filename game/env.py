@@ -0,0 +1,199 @@
+"""
+Reinforcement learning environments for Space Rocks, following the reset()/step() API of Gymnasium (without depending
+on it).
+
+The games run headless, nothing is ever drawn. An action is a bitmask of the actions in utils.input_utils (quitting is
+ignored), so there are 16 possible actions. An observation is a flat float32 NumPy array made of:
+
+    the spaceship   x & y (as a fraction of the play field size), velocity, direction & whether it is still alive
+    the asteroids   for the NEAREST_ASTEROIDS closest asteroids: the offset from the spaceship (as a fraction of the
+                    play field size, taking the wrapping around the edges into account), velocity & size (as a
+                    fraction of the largest size). Missing asteroids are all zeros
+
+Rewards are 1 per asteroid destroyed, WIN_REWARD for winning & LOSS_REWARD for losing.
+
+This requires numpy, which is an optional dependency of the game.
+"""
+import random
+
+import numpy as np
+
+from space_rocks import SpaceRocks
+from models.asteroid import Asteroid
+from utils.asset_utils import AssetRegistry
+from utils.input_utils import QUIT
+
+NEAREST_ASTEROIDS = 8
+SPACESHIP_FEATURES = 7
+ASTEROID_FEATURES = 5
+OBSERVATION_SIZE = SPACESHIP_FEATURES + NEAREST_ASTEROIDS * ASTEROID_FEATURES
+ACTIONS = 16
+LARGEST_ASTEROID = max(Asteroid.SIZE_TO_SCALE)
+
+WIN_REWARD = 10.0
+LOSS_REWARD = -10.0
+
+
+class _ActionInput:
+    """
+    Input source giving the game the action passed to step()
+    """
+
+    def __init__(self):
+        self.actions = 0
+
+    def read(self) -> int:
+        return self.actions
+
+
+def observe(game, observation=None):
+    """
+    Fills in the observation of the given game
+    :param observation: float32 array of OBSERVATION_SIZE to write to, a new one is created if not given
+    """
+    if observation is None:
+        observation = np.zeros(OBSERVATION_SIZE, dtype=np.float32)
+    else:
+        observation.fill(0)
+
+    w, h = game.field.get_size()
+    spaceship = game.spaceship
+    if spaceship is None:
+        return observation
+
+    x, y = spaceship.position
+    observation[:SPACESHIP_FEATURES] = (x / w, y / h, *spaceship.velocity, *spaceship.direction, 1.0)
+
+    if not game.asteroids:
+        return observation
+
+    asteroids = np.array([(*asteroid.position, *asteroid.velocity, asteroid.size) for asteroid in game.asteroids],
+                         dtype=np.float32)
+
+    # offsets to the asteroids, going the short way around the edges of the screen
+    size = np.array((w, h), dtype=np.float32)
+    offsets = asteroids[:, :2] - (x, y)
+    offsets -= np.round(offsets / size) * size
+    distances = np.einsum("ij,ij->i", offsets, offsets)
+
+    count = min(NEAREST_ASTEROIDS, len(asteroids))
+    nearest = np.argpartition(distances, count - 1)[:count] if count < len(asteroids) else np.arange(count)
+    nearest = nearest[np.argsort(distances[nearest])]
+
+    features = observation[SPACESHIP_FEATURES:].reshape(NEAREST_ASTEROIDS, ASTEROID_FEATURES)
+    features[:count, :2] = offsets[nearest] / size
+    features[:count, 2:4] = asteroids[nearest, 2:4]
+    features[:count, 4] = asteroids[nearest, 4] / LARGEST_ASTEROID
+    return observation
+
+
+class SpaceRocksEnv:
+    """
+    A single Space Rocks game as an environment
+    """
+    observation_size = OBSERVATION_SIZE
+    actions = ACTIONS
+
+    def __init__(self, max_steps=10_000, seed=None, assets=None):
+        """
+        :param max_steps: episodes are truncated after this many steps
+        :param seed: seeds the sequence of games played, each reset() without a seed plays the next game in it
+        :param assets: AssetRegistry shared by all the games, so sprites are only loaded once
+        """
+        self.max_steps = max_steps
+        self.assets = assets or AssetRegistry(convert=False)
+        self.game = None
+        self.steps = 0
+        self._input = _ActionInput()
+        self._seeds = random.Random(seed)
+        self._asteroids_destroyed = 0
+
+    def reset(self, seed=None):
+        """
+        Starts a new game
+        :returns: tuple of the first observation & an info dict
+        """
+        if seed is None:
+            seed = self._seeds.randrange(2 ** 32)
+
+        self.game = SpaceRocks(headless=True, seed=seed, input_source=self._input, assets=self.assets)
+        self.steps = 0
+        self._asteroids_destroyed = 0
+        return observe(self.game), {"seed": seed}
+
+    def step(self, action):
+        """
+        Plays a single frame of the game with the given action
+        :returns: tuple of observation, reward, terminated (the game was won or lost), truncated (max_steps was
+        reached) & an info dict
+        """
+        game = self.game
+        self._input.actions = int(action) & ~QUIT
+        game._handle_input()
+        game._game_engine()
+        self.steps += 1
+
+        reward = float(game.asteroids_destroyed - self._asteroids_destroyed)
+        self._asteroids_destroyed = game.asteroids_destroyed
+
+        terminated = bool(game.message)
+        if terminated:
+            reward += WIN_REWARD if game.spaceship else LOSS_REWARD
+
+        truncated = not terminated and self.steps >= self.max_steps
+        info = {"steps": self.steps, "message": game.message}
+        return observe(game), reward, terminated, truncated, info
+
+
+class SpaceRocksVectorEnv:
+    """
+    Many Space Rocks games advanced in lockstep in a single process. Observations, rewards & flags are batched in
+    arrays with one row per game. Games that end are reset straight away, the last observation of the finished game is
+    put in the info dict of that game as final_observation.
+    """
+    observation_size = OBSERVATION_SIZE
+    actions = ACTIONS
+
+    def __init__(self, num_envs, max_steps=10_000, seed=None):
+        seeds = random.Random(seed)
+        assets = AssetRegistry(convert=False)
+        self.num_envs = num_envs
+        self.envs = [SpaceRocksEnv(max_steps, seeds.randrange(2 ** 32), assets) for _ in range(num_envs)]
+        self._observations = np.zeros((num_envs, OBSERVATION_SIZE), dtype=np.float32)
+        self._rewards = np.zeros(num_envs, dtype=np.float32)
+        self._terminated = np.zeros(num_envs, dtype=bool)
+        self._truncated = np.zeros(num_envs, dtype=bool)
+
+    def reset(self, seed=None):
+        """
+        :returns: tuple of the observations, an array of shape (num_envs, observation_size), & a list of info dicts
+        """
+        infos = []
+        for index, env in enumerate(self.envs):
+            observation, info = env.reset(None if seed is None else seed + index)
+            self._observations[index] = observation
+            infos.append(info)
+        return self._observations.copy(), infos
+
+    def step(self, actions):
+        """
+        :param actions: one action per game
+        :returns: tuple of observations, rewards, terminated & truncated arrays & a list of info dicts
+        """
+        infos = []
+        for index, (env, action) in enumerate(zip(self.envs, actions)):
+            observation, reward, terminated, truncated, info = env.step(action)
+
+            if terminated or truncated:
+                info["final_observation"] = observation
+                observation, reset_info = env.reset()
+                info["seed"] = reset_info["seed"]
+
+            self._observations[index] = observation
+            self._rewards[index] = reward
+            self._terminated[index] = terminated
+            self._truncated[index] = truncated
+            infos.append(info)
+
+        return (self._observations.copy(), self._rewards.copy(), self._terminated.copy(), self._truncated.copy(),
+                infos)
@@ -0,0 +1,438 @@
+"""
+Multiplayer over the network, using deterministic lockstep.
+
+Every player runs the whole game on their own machine. A game is fully determined by its seed & the actions of every
+player in every tick (see SpaceRocks.step), so the actions are all that is sent over the network: a single byte per
+player per tick.
+
+Players connect to a server over TCP. Once everyone has joined, the server tells every player their index & the seed
+of the game. From then on it collects the actions of every player & as soon as it has all of them for a tick, sends
+them to every player in a single message.
+
+Waiting for the actions of the other players before every tick would make the game as slow as the slowest
+connection. Instead the actions that have not arrived yet are predicted (the other players keep doing what they did
+last), the state of the game is saved & the game goes on. When the actual actions arrive & differ from the prediction,
+the game is rolled back to the state saved before the mispredicted tick & simulated again up to the current tick. The
+actions of the player are delayed by input_delay ticks as well, which gives them time to reach the other players
+before they are needed.
+
+Messages:
+
+    welcome     player index (1 byte), number of players (1 byte), seed (8 bytes), sent by the server
+    actions     tick (4 bytes) & the actions of the player in that tick (1 byte), sent by the players
+    tick        tick (4 bytes) & the actions of every player in that tick (1 byte each), sent by the server
+
+Everything can be tried on a single machine. The loopback command starts a server & headless bots playing together
+over the loopback interface, with simulated network latency, & checks they all end up in exactly the same game:
+
+    python game/lockstep.py loopback --players 4 --latency 80
+    python game/lockstep.py server --players 2
+    python game/lockstep.py client --host 127.0.0.1
+"""
+import argparse
+import asyncio
+import hashlib
+import pickle
+import random
+import socket
+import struct
+
+from space_rocks import SpaceRocks
+from utils.input_utils import QUIT
+
+DEFAULT_PORT = 7777
+WELCOME = struct.Struct("<BBq")
+ACTIONS = struct.Struct("<IB")
+TICK = struct.Struct("<I")
+
+
+class LockstepSession:
+    """
+    Advances a game in lockstep with the other players, whatever the transport. advance() plays a tick with the actions
+    of this player & returns the actions messages to send to the server, confirm() is called with the actions of every
+    player for a tick as they are received from the server, in any order.
+    """
+
+    def __init__(self, game, players, player, input_delay=2, max_rollback=30):
+        """
+        :param game: SpaceRocks game with one spaceship per player
+        :param players: number of players
+        :param player: index of this player
+        :param input_delay: number of ticks between reading the actions of the player & playing them
+        :param max_rollback: the game stops advancing when it is this many ticks ahead of the last tick with the
+        actions of every player, rather than predicting further & further ahead
+        """
+        self.game = game
+        self.players = players
+        self.player = player
+        self.input_delay = input_delay
+        self.max_rollback = max_rollback
+        # next tick to play & first tick the actions of every player are not known for
+        self.tick = 0
+        self.confirmed_tick = 0
+        self.rollbacks = 0
+        self.resimulated_ticks = 0
+        self._confirmed = {}
+        self._local = {}
+        self._played = {}
+        self._states = {}
+        self._last_confirmed = (0,) * players
+        self._rollback_from = None
+        self._forgotten_tick = 0
+
+        # nobody takes any action in the first input_delay ticks
+        self._outgoing = [(tick, 0) for tick in range(input_delay)]
+        self._local.update(self._outgoing)
+
+    def can_advance(self) -> bool:
+        return self.tick - self.confirmed_tick < self.max_rollback
+
+    def advance(self, actions):
+        """
+        Plays the next tick. The given actions of this player are played input_delay ticks later
+        :returns: list of (tick, actions) messages to send to the server
+        """
+        self._local[self.tick + self.input_delay] = actions
+        self._outgoing.append((self.tick + self.input_delay, actions))
+        outgoing, self._outgoing = self._outgoing, []
+
+        self.synchronize()
+        self._play(self.tick)
+        self.tick += 1
+        return outgoing
+
+    def confirm(self, tick, actions):
+        """
+        Records the actions of every player for the given tick. A tick that was played with other actions is played
+        again, with every tick after it, the next time the game advances or is synchronized
+        """
+        self._confirmed[tick] = tuple(actions)
+
+        while self.confirmed_tick in self._confirmed:
+            confirmed = self._confirmed[self.confirmed_tick]
+            played = self._played.get(self.confirmed_tick)
+            if played is not None and played != confirmed and self._rollback_from is None:
+                self._rollback_from = self.confirmed_tick
+
+            self._last_confirmed = confirmed
+            self.confirmed_tick += 1
+
+    def synchronize(self):
+        """
+        Rolls back & plays again the ticks that were played with wrongly predicted actions, if any
+        """
+        if self._rollback_from is not None:
+            start, self._rollback_from = self._rollback_from, None
+            self.game.set_state(self._states[start])
+            self.rollbacks += 1
+            # the effects & sounds of these ticks were shown & played when they were first played
+            self.game.particles.emitting = False
+            self.game.sounds.muted = True
+            for tick in range(start, self.tick):
+                self._play(tick)
+                self.resimulated_ticks += 1
+            self.game.particles.emitting = True
+            self.game.sounds.muted = False
+
+        # ticks that were played with their confirmed actions are never played again, what was kept for them can go.
+        # The actions of a tick can be confirmed before it is played, those are kept until it is
+        forget_until = min(self.confirmed_tick, self.tick)
+        for tick in range(self._forgotten_tick, forget_until):
+            self._states.pop(tick, None)
+            self._played.pop(tick, None)
+            self._confirmed.pop(tick, None)
+            self._local.pop(tick, None)
+        self._forgotten_tick = max(self._forgotten_tick, forget_until)
+
+    def _play(self, tick):
+        actions = self._confirmed.get(tick)
+        if actions is None:
+            # the state is only needed to play the tick again, once its actual actions are known
+            self._states[tick] = self.game.get_state()
+            predicted = list(self._last_confirmed)
+            predicted[self.player] = self._local.get(tick, 0)
+            actions = tuple(predicted)
+
+        self._played[tick] = actions
+        self.game.step(actions)
+
+
+class LockstepServer:
+    """
+    Relays the actions of the players. The server does not run the game, it only waits for every player to join, then
+    gathers the actions of every player tick by tick & sends them to everyone. Players that leave take no more actions.
+    """
+
+    def __init__(self, players, seed=None, host="127.0.0.1", port=DEFAULT_PORT):
+        self.players = players
+        self.seed = random.randrange(2 ** 32) if seed is None else seed
+        self.host = host
+        self.port = port
+        self._server = None
+        self._writers = []
+        self._handlers = []
+        self._left = set()
+        self._actions = {}
+        self._next_tick = 0
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle_player, self.host, self.port)
+        # port 0 picks any free port
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        """
+        Stops accepting players & waits for the players still connected to leave
+        """
+        if self._server is not None:
+            self._server.close()
+        await asyncio.gather(*self._handlers)
+
+    async def _handle_player(self, reader, writer):
+        player = len(self._writers)
+        if player >= self.players:
+            writer.close()
+            return
+
+        writer.get_extra_info("socket").setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._writers.append(writer)
+        self._handlers.append(asyncio.current_task())
+        if len(self._writers) == self.players:
+            for index, player_writer in enumerate(self._writers):
+                player_writer.write(WELCOME.pack(index, self.players, self.seed))
+
+        try:
+            while True:
+                tick, actions = ACTIONS.unpack(await reader.readexactly(ACTIONS.size))
+                self._actions.setdefault(tick, [None] * self.players)[player] = actions
+                self._send_ticks()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            self._left.add(player)
+            self._send_ticks()
+        finally:
+            writer.close()
+
+    def _send_ticks(self):
+        """
+        Sends every tick, in order, that has the actions of all the players still in the game
+        """
+        if len(self._left) == self.players:
+            return
+
+        while True:
+            actions = self._actions.get(self._next_tick)
+            if actions is None:
+                return
+
+            actions = [0 if player in self._left else player_actions for player, player_actions in enumerate(actions)]
+            if None in actions:
+                return
+
+            message = TICK.pack(self._next_tick) + bytes(actions)
+            for player, writer in enumerate(self._writers):
+                if player not in self._left:
+                    writer.write(message)
+
+            del self._actions[self._next_tick]
+            self._next_tick += 1
+
+
+class LockstepClient:
+    """
+    Plays a game on a lockstep server. The game is created once the server has said who this player is & which seed
+    to play, the actions of the player are read from its input source every tick.
+    """
+
+    def __init__(self, host="127.0.0.1", port=DEFAULT_PORT, input_delay=2, latency=0.0, **game_options):
+        """
+        :param latency: seconds of extra, random, delay added to every message received, to see how the game copes with
+        a slow network. Messages are delayed between half & one & a half times as much, so they can arrive out of order
+        :param game_options: passed on to SpaceRocks
+        """
+        self.host = host
+        self.port = port
+        self.input_delay = input_delay
+        self.latency = latency
+        self.game_options = game_options
+        self.game = None
+        self.session = None
+        self._writer = None
+        self._receiver = None
+        self._random = random.Random()
+
+    async def connect(self):
+        reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        self._writer.get_extra_info("socket").setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        player, players, seed = WELCOME.unpack(await reader.readexactly(WELCOME.size))
+        # frames are paced by the client, the game itself must not wait on its clock
+        self.game = SpaceRocks(seed=seed, players=players, player=player, render_fps=0, **self.game_options)
+        self.session = LockstepSession(self.game, players, player, self.input_delay)
+        self._receiver = asyncio.create_task(self._receive(reader, players))
+
+    async def _receive(self, reader, players):
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                (tick,) = TICK.unpack(await reader.readexactly(TICK.size))
+                actions = await reader.readexactly(players)
+                if self.latency:
+                    delay = self.latency * self._random.uniform(0.5, 1.5)
+                    loop.call_later(delay, self.session.confirm, tick, actions)
+                else:
+                    self.session.confirm(tick, actions)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+
+    async def play(self, ticks=None):
+        """
+        Plays the game at FPS ticks per second until the player quits, the server goes away, or for the given number of
+        ticks
+        """
+        game = self.game
+        session = self.session
+        loop = asyncio.get_running_loop()
+        next_tick_at = loop.time()
+
+        while ticks is None or session.tick < ticks:
+            if self._receiver.done():
+                # without the server the actions of the other players never come, the game can't go on
+                break
+
+            # sleeping, even for no time at all, lets the messages of the server be received
+            await asyncio.sleep(max(0.0, next_tick_at - loop.time()))
+            if loop.time() < next_tick_at:
+                continue
+
+            if not session.can_advance():
+                # too far ahead of the other players, waits for their actions
+                next_tick_at = loop.time() + 0.001
+                # the window is kept responsive & the player can still quit. Bots are only read when they play a tick
+                if not game.headless and game.input_source.read() & QUIT:
+                    break
+                continue
+
+            actions = game.input_source.read()
+            if actions & QUIT:
+                break
+
+            for tick, tick_actions in session.advance(actions & ~QUIT):
+                self._writer.write(ACTIONS.pack(tick, tick_actions))
+            next_tick_at += 1 / game.FPS
+
+            if not game.headless:
+                game.sounds.flush()
+                game._draw()
+
+    async def finish(self, ticks):
+        """
+        Waits for the actions of every player up to the given tick & plays again whatever was mispredicted, so the game
+        is exactly the same for every player
+        """
+        while self.session.confirmed_tick < ticks:
+            await asyncio.sleep(0.005)
+        self.session.synchronize()
+
+    def close(self):
+        if self._receiver is not None:
+            self._receiver.cancel()
+        if self._writer is not None:
+            self._writer.close()
+
+
+class RandomBot:
+    """
+    Input source for the bots of the loopback test, it changes its mind about what to do every now & then
+    """
+
+    def __init__(self, seed, change_probability=0.05):
+        self.random = random.Random(seed)
+        self.change_probability = change_probability
+        self.actions = 0
+
+    def read(self) -> int:
+        if self.random.random() < self.change_probability:
+            self.actions = self.random.randrange(QUIT)
+        return self.actions
+
+
+def checksum(game):
+    return hashlib.sha1(pickle.dumps(game.get_state())).hexdigest()
+
+
+async def loopback(players, ticks, latency=0.0, input_delay=2, seed=None):
+    """
+    Plays a game with a server & headless bots over the loopback interface
+    :returns: the clients, once every one of them has played the given number of ticks
+    """
+    server = LockstepServer(players, seed=seed, port=0)
+    await server.start()
+
+    clients = [
+        LockstepClient(port=server.port, input_delay=input_delay, latency=latency, headless=True,
+                       input_source=RandomBot(bot))
+        for bot in range(players)
+    ]
+    await asyncio.gather(*(client.connect() for client in clients))
+    await asyncio.gather(*(client.play(ticks) for client in clients))
+    await asyncio.gather(*(client.finish(ticks) for client in clients))
+
+    for client in clients:
+        client.close()
+    await server.close()
+    return clients
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    server_parser = commands.add_parser("server", help="relays the actions of the players")
+    server_parser.add_argument("--players", type=int, default=2)
+    server_parser.add_argument("--seed", type=int, default=None)
+    server_parser.add_argument("--host", default="0.0.0.0")
+    server_parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+
+    client_parser = commands.add_parser("client", help="plays on a server with the keyboard")
+    client_parser.add_argument("--host", default="127.0.0.1")
+    client_parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    client_parser.add_argument("--input-delay", type=int, default=2)
+
+    loopback_parser = commands.add_parser("loopback", help="plays bots against each other on this machine")
+    loopback_parser.add_argument("--players", type=int, default=2)
+    loopback_parser.add_argument("--ticks", type=int, default=300)
+    loopback_parser.add_argument("--latency", type=float, default=50, help="simulated latency in milliseconds")
+    loopback_parser.add_argument("--input-delay", type=int, default=2)
+    loopback_parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.command == "server":
+        server = LockstepServer(args.players, seed=args.seed, host=args.host, port=args.port)
+        print(f"waiting for {args.players} players on port {args.port}, seed {server.seed}")
+        asyncio.run(server.serve_forever())
+    elif args.command == "client":
+        async def play():
+            client = LockstepClient(args.host, args.port, input_delay=args.input_delay)
+            await client.connect()
+            await client.play()
+            client.close()
+
+        asyncio.run(play())
+    else:
+        clients = asyncio.run(loopback(args.players, args.ticks, args.latency / 1000, args.input_delay, args.seed))
+        checksums = {checksum(client.game) for client in clients}
+        for client in clients:
+            session = client.session
+            print(f"player {session.player}: {session.rollbacks} rollbacks, {session.resimulated_ticks} ticks played "
+                  f"again, {checksum(client.game)}")
+        print("in sync" if len(checksums) == 1 else "OUT OF SYNC")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,27 @@ from pygame.math import Vector2
 from .utils import wrap_position
 
 
+class Appearance:
+    """
+    What every object drawn with the same sprite has in common: the sprite, the radius of the collision zone around the
+    object & the scale the sprite was scaled by. Objects of the same kind share one Appearance, instead of each of them
+    keeping a reference to the sprite & its own radius.
+    """
+    __slots__ = ("sprite", "radius", "scale")
+
+    def __init__(self, sprite, scale=1):
+        self.sprite = sprite
+        self.radius = sprite.get_width() / 2
+        self.scale = scale
+
+
+def as_appearance(sprite):
+    """
+    Returns the given Appearance, or a new one for the given sprite
+    """
+    return sprite if isinstance(sprite, Appearance) else Appearance(sprite)
+
+
 class GameObject:
     """
     This represents a typical object in the game & will encapsulate all generic
@@ -14,54 +35,171 @@ class GameObject:
     Vectors can be added, subtracted, or even multiplied to quickly update the position of a sprite. 
     Reference on this can be found here https://www.intmath.com/vectors/3-vectors-2-dimensions.php
 
+    A game object can optionally be attached to a World (see models.world), in which case its position & velocity are
+    stored in the world's arrays & the properties below read from & write to those arrays instead.
+    KIND: the kind of object this is in a World, set by every subclass
+
+    There can be tens of thousands of game objects, so they are kept small: attributes are stored in __slots__ instead
+    of a __dict__ & the sprite, radius & scale come from the Appearance the object shares with the others of its kind.
     """
+    __slots__ = ("world", "slot", "previous_position", "skipped_ticks", "_position", "_velocity", "appearance")
+    KIND = None
 
     def __init__(self, position: tuple, sprite, velocity):
         """
         Initializes a game object
         :param position: A point in the center of object on the 2D scree
         :type position tuple
-        :param sprite: an image used to display the object
+        :param sprite: an image used to display the object, or the Appearance it shares with other objects
         :param velocity: a value used for movement
         :type velocity tuple or Vector
         radius A value representing the collision zone around the object’s position
         """
-        self.position = Vector2(position)
-        self.sprite = sprite
-        self.velocity = Vector2(velocity)
-        self.radius = sprite.get_width() / 2
+        self.world = None
+        self.slot = None
+        self.previous_position = None
+        self.skipped_ticks = 0
+        self._position = Vector2(position)
+        self._velocity = Vector2(velocity)
+        self.appearance = as_appearance(sprite)
 
-    def draw(self, surface):
+    def reset(self, position: tuple, sprite, velocity):
         """
-        draw the object’s sprite on the surface passed as an argument.
+        Reinitializes the object in place, with the same arguments as the constructor. Used by models.pool.Pool to
+        reuse objects that are no longer in the game instead of creating new ones
         """
-        # calculates the correct position for blitting the image. 
-        # Notice that the Vector2() constructor receives a single number instead of a tuple. 
-        # In that case, it will use that number for both values. So Vector2(self.radius) i
-        # s the equivalent of Vector2((self.radius, self.radius))
-        blit_position = self.position - Vector2(self.radius)
+        if self.world is None:
+            self._position.update(position)
+            self._velocity.update(velocity)
+        else:
+            self.position = position
+            self.velocity = velocity
+
+        self.appearance = as_appearance(sprite)
+        self.previous_position = None
+        self.skipped_ticks = 0
+
+    @property
+    def sprite(self):
+        return self.appearance.sprite
+
+    @property
+    def radius(self):
+        return self.appearance.radius
+
+    @property
+    def scale(self):
+        return self.appearance.scale
+
+    @property
+    def position(self):
+        if self.world is None:
+            return self._position
+        return Vector2(self.world.positions[self.slot].tolist())
 
-        # uses the newly calculated blit position to put the object’s sprite in a correct place on the given surface.
-        surface.blit(self.sprite, blit_position)
+    @position.setter
+    def position(self, position):
+        if self.world is None:
+            self._position = Vector2(position)
+        else:
+            self.world.positions[self.slot] = position
 
-    def move(self, surface):
+    @property
+    def velocity(self):
+        if self.world is None:
+            return self._velocity
+        return Vector2(self.world.velocities[self.slot].tolist())
+
+    @velocity.setter
+    def velocity(self, velocity):
+        if self.world is None:
+            self._velocity = Vector2(velocity)
+        else:
+            self.world.velocities[self.slot] = velocity
+
+    def _coordinates(self):
+        if self.world is None:
+            return self._position.x, self._position.y
+        x, y = self.world.positions[self.slot].tolist()
+        return x, y
+
+    def remember_position(self):
         """
-        Updates the position of the object
+        Keeps the current position as the previous one, to interpolate from, see interpolated_position
+        """
+        self.previous_position = self._coordinates()
+
+    def interpolated_position(self, alpha, surface):
+        """
+        Position of the object between the previous physics tick & the current one, used to draw it smoothly when frames
+        are rendered at a different rate than the physics run at (see utils.loop_utils.FixedStepScheduler).
+        :param alpha: how far between the previous position (0) & the current one (1) the object should be drawn
+        :param surface: the surface the object wraps around. An object that wrapped around an edge since the previous tick
+        is drawn at its current position instead of being dragged across the whole screen
+        :returns: the position as an (x, y) tuple. This runs for every object in every frame, so it is computed with
+        plain floats instead of creating vectors
+        """
+        x, y = self._coordinates()
+        previous = self.previous_position
+        if previous is None or alpha >= 1:
+            return x, y
+
+        previous_x, previous_y = previous
+        delta_x = x - previous_x
+        delta_y = y - previous_y
+        w, h = surface.get_size()
+        if abs(delta_x) > w / 2 or abs(delta_y) > h / 2:
+            return x, y
+
+        return previous_x + delta_x * alpha, previous_y + delta_y * alpha
 
+    def blit_position(self, surface, alpha=1.0):
+        """
+        calculates the correct position for blitting the image, the top left corner of the sprite. The sprite is
+        centered on the position of the object, so that is the position moved up & left by the radius.
+        This is the same as self.position - Vector2(self.radius), computed with the floats of interpolated_position.
+        """
+        x, y = self.interpolated_position(alpha, surface)
+        radius = self.appearance.radius
+        return x - radius, y - radius
+
+    def draw(self, surface, alpha=1.0, camera=None):
+        """
+        draw the object’s sprite on the surface passed as an argument.
+        :param alpha: interpolation factor between the previous & current physics tick, see interpolated_position
+        :param camera: utils.camera_utils.Camera the surface shows the play field through, if the play field is larger
+        than the surface
+        :returns: the area of the surface the sprite was drawn on
+        """
+        # uses the blit position to put the object’s sprite in a correct place on the given surface.
+        blit_position = self.blit_position(surface, alpha)
+        if camera is not None:
+            blit_position = camera.to_screen(blit_position)
+        return surface.blit(self.sprite, blit_position)
+
+    def move(self, surface, ticks=1):
+        """
+        Updates the position of the object
+        :param ticks: number of ticks to move the object by at once, objects far away from the camera are only moved
+        every few ticks (see SpaceRocks). Objects move in a straight line, so this ends up at the same position as
+        moving the object once per tick
         """
         # adds the velocity to the position and gets an updated position vector as a result. 
         # Pygame makes manipulating vectors straightforward, allowing you to add them like numbers
-        self.position = wrap_position(self.position + self.velocity, surface)
+        velocity = self.velocity if ticks == 1 else self.velocity * ticks
+        self.position = wrap_position(self.position + velocity, surface)
 
     def collides_with(self, other) -> bool:
         """
         This is used to detect collisions with other objects
         :param other: Other game object
         :returns: Returns True if the distance between this object & another is smaller than the sum
-        of the radiuses
+        of the radiuses. This is the narrow phase of collision detection, see utils.collision_utils for the broad phase
         """
-        # calculates the distance between two objects 
-        distance = self.position.distance_to(other.position)
+        # compares squared distances, this gives the same answer as comparing the distance itself but avoids
+        # computing a square root for every pair of objects that gets checked
+        radiuses = self.appearance.radius + other.appearance.radius
+        distance_squared = self.position.distance_squared_to(other.position)
 
         # checks if that distance is smaller than the sum of the objects’ radiuses. If so, the objects collide.
-        return distance < self.radius + other.radius
+        return distance_squared < radiuses * radiuses
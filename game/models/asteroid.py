@@ -1,5 +1,9 @@
-from pygame.transform import rotozoom
-from . import GameObject
+import random
+
+from utils.game_utils import get_random_velocity
+from utils.particle_utils import NullParticles
+from . import GameObject, Appearance
+from .world import ASTEROID
 
 
 class Asteroid(GameObject):
@@ -9,40 +13,86 @@ class Asteroid(GameObject):
     Note that the setting of a random position is in one place &  setting of random velocity is in another(here).
     That’s because the position should be random only for the six asteroids you start with, so it’s being set where the
     game is initialized. However, the velocity is random for every asteroid, so you set it in the constructor here.
+
+    SPRITE: name of the sprite used for all asteroids
+    SIZE_TO_SCALE: lookup table containing the scale of the sprite for the different sizes of an asteroid
     """
+    __slots__ = ("size", "spawner")
+    KIND = ASTEROID
+    SPRITE = "asteroid"
+    SIZE_TO_SCALE = {
+        3: 1,
+        2: 0.5,
+        1: 0.25,
+    }
 
-    def __init__(self, position, sprite, create_asteroid, random_velocity, size=3):
+    def __init__(self, position, spawner, random_velocity, size=3):
         """
         :param position: Position of the Asteroid
-        :param create_asteroid: Callback to create an asteroid when this asteroid is split up. it should be split up
-        into smaller asteroids based on the scale of the new size
+        :param spawner: the AsteroidSpawner of the game, which the asteroid uses to split up into smaller asteroids
         :param size Initial size of the asteroid, starts at 3. When it is split by a bullet to 2, then 1, then it is
         destroyed
         This will assign a size to an asteroid, using the default value 3, which represents a big asteroid.
-        It will also scale the original sprite by using rotozoom(). This method is used for scaling if the angle is 0
-        and the scale is anything other than 0. the size_to_scale lookup table contains scales for different sizes
+        The sprite, scaled by the asset registry with rotozoom() once per size, comes from the spawner.
         """
         self.size = size
-        self.create_asteroid = create_asteroid
-        size_to_scale = {
-            3: 1,
-            2: 0.5,
-            1: 0.25,
-        }
-        scale = size_to_scale[size]
-        sprite = rotozoom(sprite, 0, scale)
+        self.spawner = spawner
 
         # Notice the get_random_velocity uses the minimum value of 1,this is because the asteroid should always move
         # at least a bit.
-        super().__init__(position, sprite, random_velocity)
+        super().__init__(position, spawner.appearances[size], random_velocity)
+
+    def reset(self, position, spawner, random_velocity, size=3):
+        self.size = size
+        self.spawner = spawner
+        super().reset(position, spawner.appearances[size], random_velocity)
 
     def split(self):
         """
         Splits an Asteroid into smaller asteroids when hit by a bullet.
         This will create two new asteroids at the same position as the current one. Each of them will have a slightly
         smaller size. This logic will happen only if the current asteroid is a medium or large one.
+        Whatever its size, bits of rock fly off it.
         """
+        spawner = self.spawner
+        spawner.particles.debris(self.position, self.size)
         if self.size > 1:
             for _ in range(2):
-                asteroid = Asteroid(self.position, self.sprite, self.create_asteroid, self.size - 1)
-                self.create_asteroid(asteroid)
+                asteroid = spawner.spawn(self.position, get_random_velocity(1, 3, spawner.rng), self.size - 1)
+                spawner.create_asteroid(asteroid)
+
+
+class AsteroidSpawner:
+    """
+    Creates the asteroids of a game & holds everything they have in common: the callback adding the asteroids an
+    asteroid splits into to the game, the source of randomness for their velocities, the pool they are taken from, the
+    particle system their debris goes to & an Appearance per size. Every asteroid keeps a reference to the spawner
+    instead of its own copy of each of these.
+    """
+    __slots__ = ("create_asteroid", "rng", "pool", "particles", "appearances")
+
+    def __init__(self, assets, create_asteroid, rng=random, pool=None, particles=None):
+        """
+        :param assets: the AssetRegistry the sprites of the asteroids come from
+        :param create_asteroid: Callback to create an asteroid when an asteroid is split up. it should be split up
+        into smaller asteroids based on the scale of the new size
+        :param rng: source of randomness for the velocities of the asteroids an asteroid splits into
+        :param pool: optional models.pool.Pool the asteroids are taken from
+        :param particles: particle system the debris of the asteroids hit is emitted to, see utils.particle_utils
+        """
+        self.create_asteroid = create_asteroid
+        self.rng = rng
+        self.pool = pool
+        self.particles = NullParticles() if particles is None else particles
+        self.appearances = {
+            size: Appearance(assets.sprite(Asteroid.SPRITE, scale=scale), scale)
+            for size, scale in Asteroid.SIZE_TO_SCALE.items()
+        }
+
+    def spawn(self, position, velocity, size=3):
+        """
+        Returns a new asteroid, which still has to be added to the game. The pool hands out a reused asteroid when it
+        has one, otherwise a new Asteroid is created
+        """
+        new_asteroid = Asteroid if self.pool is None else self.pool.acquire
+        return new_asteroid(position, self, velocity, size)
@@ -1,13 +1,17 @@
 from . import GameObject
+from .world import BULLET
 
 
 class Bullet(GameObject):
     """
     Represents a Bullet
     """
+    __slots__ = ()
+    KIND = BULLET
 
     def __init__(self, position, sprite, velocity):
         super().__init__(position, sprite, velocity)
 
-    def move(self, surface):
-        self.position = self.position + self.velocity
+    def move(self, surface, ticks=1):
+        velocity = self.velocity if ticks == 1 else self.velocity * ticks
+        self.position = self.position + velocity
@@ -0,0 +1,66 @@
+class Pool:
+    """
+    Object pool for game objects that are created & thrown away all the time, like bullets & asteroids. Instead of
+    building a new object (and its vectors) every time one is needed & leaving the old ones to the garbage collector,
+    objects that are no longer in the game are released back into the pool & handed out again later.
+
+    Released objects are kept on a free list, a plain list used as a stack, so both acquiring & releasing an object is
+    O(1). Pooled classes implement reset() with the same arguments as their constructor, it reinitializes an old object
+    in place.
+    """
+
+    def __init__(self, factory, capacity=0):
+        """
+        :param factory: class (or callable) creating a new object when the pool is empty
+        :param capacity: number of objects the pool may keep on its free list, 0 means no limit. Objects released into
+        a full pool are left to the garbage collector
+        """
+        self.factory = factory
+        self.capacity = capacity
+        self.created = 0
+        self.reused = 0
+        self.in_use = 0
+        self._free = []
+
+    def __len__(self):
+        return len(self._free)
+
+    def acquire(self, *args, **kwargs):
+        """
+        Returns an object initialized with the given arguments, reusing a released object if there is one
+        """
+        self.in_use += 1
+
+        if self._free:
+            game_object = self._free.pop()
+            game_object.reset(*args, **kwargs)
+            self.reused += 1
+            return game_object
+
+        self.created += 1
+        return self.factory(*args, **kwargs)
+
+    def release(self, game_object):
+        """
+        Gives an object back to the pool. It must not be used by the game anymore after this
+        """
+        self.in_use -= 1
+        if not self.capacity or len(self._free) < self.capacity:
+            self._free.append(game_object)
+
+    def release_all(self, game_objects):
+        for game_object in game_objects:
+            self.release(game_object)
+
+    def stats(self):
+        """
+        Occupancy of the pool
+        :returns: dict with the number of objects in use, the number waiting on the free list, the number of objects
+        ever created & the number of times a released object was reused
+        """
+        return {
+            "in_use": self.in_use,
+            "free": len(self._free),
+            "created": self.created,
+            "reused": self.reused,
+        }
@@ -1,6 +1,8 @@
 from pygame.math import Vector2
-from pygame.transform import rotozoom
-from . import GameObject
+from utils.particle_utils import NullParticles
+from utils.rotation_utils import RotationAtlas
+from . import GameObject, as_appearance
+from .world import SPACESHIP
 from .bullet import Bullet
 
 # Pygame’s y-axis goes from top to bottom, so a negative value actually points upwards
@@ -19,16 +21,32 @@ class Spaceship(GameObject):
     your spaceship’s direction can rotate each frame. Using a larger number will rotate the spaceship faster, while a
     smaller number will allow more granular control over the rotation.
     ACCELERATION: constant number describing how fast the spaceship can speed up each frame.
+    Note that a frame here is a physics tick, which happens at a fixed rate (see utils.loop_utils), no matter how many
+    frames are actually rendered.
     BULLET_SPEED
     """
+    __slots__ = ("create_bullet", "bullet_pool", "rotation_atlas", "laser_sound", "bullet_sprite", "particles",
+                 "direction")
+    KIND = SPACESHIP
     MANEUVERABILITY = 3
     ACCELERATION = 0.25
     BULLET_SPEED = 3
 
-    def __init__(self, position: tuple, create_bullet_callback, sprite, bullet_sprite, laser_sound):
+    def __init__(self, position: tuple, create_bullet_callback, sprite, bullet_sprite, laser_sound,
+                 rotation_atlas=None, bullet_pool=None, particles=None):
+        """
+        :param bullet_sprite: sprite of the bullets, or the models.Appearance they all share
+        :param rotation_atlas: cache of the rotated versions of the sprite. The spaceship only ever rotates by
+        MANEUVERABILITY degrees at a time, so by default the atlas snaps angles to multiples of that
+        :param bullet_pool: optional models.pool.Pool bullets are taken from instead of creating new ones
+        :param particles: particle system the exhaust of the engine is emitted to, see utils.particle_utils
+        """
         self.create_bullet = create_bullet_callback
+        self.bullet_pool = bullet_pool
+        self.rotation_atlas = rotation_atlas or RotationAtlas(sprite, step=self.MANEUVERABILITY)
         self.laser_sound = laser_sound
-        self.bullet_sprite = bullet_sprite
+        self.bullet_sprite = as_appearance(bullet_sprite)
+        self.particles = NullParticles() if particles is None else particles
         # Make a copy of the original UP vector
         self.direction = Vector2(UP)
         super().__init__(position, sprite, Vector2(0))
@@ -44,7 +62,7 @@ class Spaceship(GameObject):
         angle = self.MANEUVERABILITY * sign
         self.direction.rotate_ip(angle)
 
-    def draw(self, surface):
+    def draw(self, surface, alpha=1.0, camera=None):
         """
         Overrides the draw method of a Game Object
 
@@ -55,27 +73,25 @@ class Spaceship(GameObject):
         The size of the new image can be significantly different than that of the original image. That’s why draw()
         recalculates the blit position of rotated_surface. Remember that blit() starts in the upper-left corner, so to
         center the rotated image, you also need to move the blit position by half the size of the image.
+
+        Rotating the sprite every frame is expensive, so the rotated surfaces & their half sizes come from the rotation
+        atlas, which only ever rotates the sprite once per angle.
         """
         # uses the angle_to() method of the Vector2 class to calculate the angle by which one vector needs to be rotated
         # in order to point in the same direction as the other vector. This makes it painless to translate the
         # spaceship’s direction into the rotation angle in degrees.
         angle = self.direction.angle_to(UP)
 
-        # rotates the sprite using rotozoom(). It takes the original image, the angle by which it should be rotated,
-        # and the scale that should be applied to the sprite. In this case, you don’t want to change the size,
-        # so you keep the scale as 1.0.
-        rotated_surface = rotozoom(self.sprite, angle, 1.0)
-
-        # recalculate the blit position, using the size of rotated_surface. The process is described below.
-        rotated_surface_size = Vector2(rotated_surface.get_size())
-
-        # contains the rotated_surface_size * 0.5 operation. That’s another thing you can do with vectors in Pygame.
-        # When you multiply a vector by a number, all its coordinates are multiplied by that number.
-        # As a result, multiplying by 0.5 will return a vector with half the length of the original.
-        blit_position = self.position - rotated_surface_size * 0.5
+        # gets the sprite rotated using rotozoom() along with half of its size, the offset from the center of the
+        # spaceship to the top left corner of the rotated surface.
+        rotated_surface, offset = self.rotation_atlas.get(angle)
 
-        # uses the newly calculated blit position to put the image on the screen.
-        surface.blit(rotated_surface, blit_position)
+        # uses the blit position to put the image on the screen. Remember that blit() starts in the upper-left corner
+        x, y = self.interpolated_position(alpha, surface)
+        if camera is not None:
+            x, y = camera.to_screen((x, y))
+        offset_x, offset_y = offset
+        return surface.blit(rotated_surface, (x - offset_x, y - offset_y))
 
     def accelerate(self):
         """
@@ -85,6 +101,7 @@ class Spaceship(GameObject):
         position of the spaceship. This happens each frame, regardless of the engine status.
         """
         self.velocity += self.direction * self.ACCELERATION
+        self.particles.trail(self.position, self.velocity, self.direction, self.radius)
 
     def shoot(self):
         """
@@ -97,8 +114,13 @@ class Spaceship(GameObject):
 
         Then an instance of the Bullet class is created at the same location as the spaceship, using the velocity that
         was just calculated. Finally, the bullet is added to all the bullets in the game by using the callback method.
+        When the spaceship has a bullet pool, an old bullet is reused instead of creating a new one.
         """
         bullet_velocity = self.direction * self.BULLET_SPEED + self.velocity
-        bullet = Bullet(position=self.position, sprite=self.bullet_sprite, velocity=bullet_velocity)
+        if self.bullet_pool is not None:
+            bullet = self.bullet_pool.acquire(position=self.position, sprite=self.bullet_sprite,
+                                              velocity=bullet_velocity)
+        else:
+            bullet = Bullet(position=self.position, sprite=self.bullet_sprite, velocity=bullet_velocity)
         self.create_bullet(bullet)
         self.laser_sound.play()
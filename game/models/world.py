@@ -0,0 +1,187 @@
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# kinds of game objects stored in the world. These decide how an object is moved each step
+ASTEROID = 0
+BULLET = 1
+SPACESHIP = 2
+
+# bullets are the only objects that do not wrap around the screen, they are culled once they leave it instead
+WRAPPING_KINDS = (ASTEROID, SPACESHIP)
+
+
+class World:
+    """
+    Array backed world state. Instead of every game object keeping its own position & velocity Vector2, these are
+    stored for all the objects in the game in contiguous NumPy arrays (a struct of arrays). That way moving every single
+    object in the game is a handful of vectorized operations instead of a Python method call & a few Vector2
+    allocations per object.
+
+    Game objects attached to a world become thin views over it, see GameObject.position & GameObject.velocity. Each one
+    knows the slot it occupies in the arrays. Removing an object moves the last object into the freed slot, so the
+    arrays never have holes & the moved object has its slot updated.
+
+    This requires numpy, which is an optional dependency of the game.
+    """
+
+    def __init__(self, capacity=256):
+        if np is None:
+            raise ImportError("World requires numpy, install it with `pipenv install numpy`")
+
+        self.count = 0
+        self.positions = np.zeros((capacity, 2), dtype=np.float64)
+        self.velocities = np.zeros((capacity, 2), dtype=np.float64)
+        self.radii = np.zeros(capacity, dtype=np.float64)
+        self.kinds = np.zeros(capacity, dtype=np.int8)
+        self.owners = []
+
+    def __len__(self):
+        return self.count
+
+    def add(self, game_object):
+        """
+        Attaches a game object to the world. Its current position & velocity are copied into the arrays & from then on
+        the world is the only place they are stored.
+        """
+        if game_object.world is not None:
+            raise ValueError("Game object is already attached to a world")
+
+        if self.count == len(self.radii):
+            self._grow()
+
+        slot = self.count
+        self.positions[slot] = game_object.position
+        self.velocities[slot] = game_object.velocity
+        self.radii[slot] = game_object.radius
+        self.kinds[slot] = game_object.KIND
+        self.owners.append(game_object)
+        self.count += 1
+
+        game_object.world = self
+        game_object.slot = slot
+        # the arrays are the only copy of the position & velocity from now on, the object's own vectors are dropped &
+        # made again when it is removed from the world
+        game_object._position = None
+        game_object._velocity = None
+
+    def remove(self, game_object):
+        """
+        Detaches a game object from the world, its position & velocity are copied back onto the object so that it can
+        still be used afterwards. The last object in the arrays is moved into the freed slot.
+        """
+        if game_object.world is not self:
+            return
+
+        slot = game_object.slot
+        position = self.positions[slot].tolist()
+        velocity = self.velocities[slot].tolist()
+        last = self.count - 1
+
+        if slot != last:
+            self.positions[slot] = self.positions[last]
+            self.velocities[slot] = self.velocities[last]
+            self.radii[slot] = self.radii[last]
+            self.kinds[slot] = self.kinds[last]
+            moved = self.owners[last]
+            self.owners[slot] = moved
+            moved.slot = slot
+
+        self.owners.pop()
+        self.count = last
+
+        game_object.world = None
+        game_object.slot = None
+        game_object.position = position
+        game_object.velocity = velocity
+
+    def step(self, size):
+        """
+        Moves every object in the world by its velocity in a single vectorized step. Asteroids & the spaceship wrap
+        around the edges of the screen, the same way wrap_position does it.
+        :param size: (width, height) of the surface objects move on
+        :returns: the bullets that have left the surface & should be culled. The same test as Rect.collidepoint is used,
+        which truncates coordinates towards zero, so a bullet at x=-0.5 is still on screen
+        """
+        n = self.count
+        if not n:
+            return []
+
+        w, h = size
+        positions = self.positions[:n]
+        positions += self.velocities[:n]
+
+        kinds = self.kinds[:n]
+        wrapping = np.isin(kinds, WRAPPING_KINDS)
+        positions[wrapping] = np.mod(positions[wrapping], (w, h))
+
+        x = positions[:, 0]
+        y = positions[:, 1]
+        on_screen = (x > -1) & (x < w) & (y > -1) & (y < h)
+        culled = np.flatnonzero((kinds == BULLET) & ~on_screen)
+
+        owners = self.owners
+        return [owners[slot] for slot in culled.tolist()]
+
+    def collisions(self, objects, others):
+        """
+        Finds which of the others every one of the objects collides with, reading the positions & radiuses straight
+        from the arrays instead of going through a Vector2 per object.
+
+        This is a sweep & prune on the x column followed by the narrow phase of GameObject.collides_with, both
+        vectorized: the others are sorted by x once, every object gets the range of others close enough along x with
+        a binary search & only those pairs are checked with the exact same squared distance test as collides_with.
+        :param objects: game objects attached to this world, the bullets for example
+        :param others: game objects attached to this world, the asteroids for example
+        :returns: a list with, for every object, the indexes in others of the ones it collides with, in increasing order
+        """
+        n = len(objects)
+        if not n or not others:
+            return [[] for _ in range(n)]
+
+        positions = self.positions
+        radii = self.radii
+        slots = np.fromiter((game_object.slot for game_object in objects), dtype=np.intp, count=n)
+        other_slots = np.fromiter((other.slot for other in others), dtype=np.intp, count=len(others))
+
+        other_x = positions[other_slots, 0]
+        by_x = np.argsort(other_x, kind="stable")
+        sorted_x = other_x[by_x]
+
+        # any pair that collides is closer than the sum of the radiuses along x, the extra pixel keeps the rounding of
+        # the bounds from leaving out a pair that only just touches
+        x = positions[slots, 0]
+        reach = radii[slots] + radii[other_slots].max() + 1
+        first = np.searchsorted(sorted_x, x - reach, side="left")
+        counts = np.searchsorted(sorted_x, x + reach, side="right") - first
+        total = int(counts.sum())
+        if not total:
+            return [[] for _ in range(n)]
+
+        pair_objects = np.repeat(np.arange(n), counts)
+        starts = np.repeat(first - (np.cumsum(counts) - counts), counts)
+        pair_others = by_x[starts + np.arange(total)]
+
+        object_slots = slots[pair_objects]
+        pair_slots = other_slots[pair_others]
+        delta = positions[pair_slots] - positions[object_slots]
+        distance_squared = delta[:, 0] * delta[:, 0] + delta[:, 1] * delta[:, 1]
+        radiuses = radii[pair_slots] + radii[object_slots]
+        hit = distance_squared < radiuses * radiuses
+
+        result = [[] for _ in range(n)]
+        for index, other in zip(pair_objects[hit].tolist(), pair_others[hit].tolist()):
+            result[index].append(other)
+        for hits in result:
+            if len(hits) > 1:
+                hits.sort()
+        return result
+
+    def _grow(self):
+        capacity = len(self.radii) * 2
+        for name in ("positions", "velocities", "radii", "kinds"):
+            array = getattr(self, name)
+            grown = np.zeros((capacity,) + array.shape[1:], dtype=array.dtype)
+            grown[:self.count] = array[:self.count]
+            setattr(self, name, grown)
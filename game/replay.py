@@ -0,0 +1,198 @@
+"""
+Recording & playback of games.
+
+A game is fully determined by its seed & the actions the player took every frame, so that is all a replay stores. The
+file starts with a header & is followed by one record per frame, which makes it an append only stream that can be
+written while the game is running:
+
+    header      b"SRRP", version (1 byte), seed (8 bytes), FPS (2 bytes)
+    frame       a single byte, the bitmask of actions taken in the frame (see utils.input_utils)
+    snapshot    SNAPSHOT_TAG, length of the snapshot (4 bytes) & SpaceRocks.get_state() at the start of the frame that
+                follows it, as UTF-8 JSON
+
+Snapshots are optional, they make it possible to jump to a frame without simulating the whole game up to it. They are
+JSON rather than pickles because replays get passed around, to reproduce a bug for example, & unpickling a file someone
+sent you can run any code they put in it. The state is made of plain values only, which JSON stores exactly.
+
+Playback simulates the game headless, as fast as possible:
+
+    python game/replay.py game.replay
+"""
+import argparse
+import json
+import mmap
+import struct
+
+from space_rocks import SpaceRocks
+from utils.input_utils import ScriptedInput, QUIT
+
+MAGIC = b"SRRP"
+VERSION = 2
+HEADER = struct.Struct("<4sBqH")
+SNAPSHOT_TAG = 0xFF
+SNAPSHOT_LENGTH = struct.Struct("<I")
+
+
+def encode_state(state) -> bytes:
+    return json.dumps(state, separators=(",", ":")).encode()
+
+
+def decode_state(data):
+    """
+    Reads back a state written by encode_state. JSON has no tuples, the state of the random number generator has to be
+    made of tuples again for random.setstate(), everything else in the state works as lists
+    """
+    state = json.loads(data)
+    version, internal_state, gauss_next = state["random"]
+    state["random"] = (version, tuple(internal_state), gauss_next)
+    return state
+
+
+class RecordingInput:
+    """
+    Input source recording the actions of another input source to a replay file as they are read. The frame the player
+    quits in is not recorded, the game quits before playing it.
+    """
+
+    def __init__(self, source, path, game=None, snapshot_interval=0, flush_interval=60):
+        """
+        :param source: input source the actions come from, the keyboard for example
+        :param path: replay file to write
+        :param game: the game being recorded. Its seed goes in the header, it can also be set later, but has to be set
+        before the first frame
+        :param snapshot_interval: number of frames between snapshots of the game, 0 means no snapshots
+        :param flush_interval: number of frames between writes to disk
+        """
+        self.source = source
+        self.path = path
+        self.game = game
+        self.snapshot_interval = snapshot_interval
+        self.flush_interval = flush_interval
+        self.frames = 0
+        self._file = None
+
+    def read(self) -> int:
+        if self._file is None:
+            self._file = open(self.path, "wb")
+            self._file.write(HEADER.pack(MAGIC, VERSION, self.game.seed, self.game.FPS))
+
+        actions = self.source.read()
+        if actions & QUIT:
+            # the game quits before this frame is played, so it is not part of the game
+            return actions
+
+        if self.snapshot_interval and self.frames % self.snapshot_interval == 0:
+            snapshot = encode_state(self.game.get_state())
+            self._file.write(bytes((SNAPSHOT_TAG,)) + SNAPSHOT_LENGTH.pack(len(snapshot)) + snapshot)
+
+        self._file.write(bytes((actions,)))
+        self.frames += 1
+
+        if self.frames % self.flush_interval == 0:
+            self._file.flush()
+
+        return actions
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class Replay:
+    """
+    A recorded game, read through a memory map. Opening a replay only scans it once to find the frames & snapshots,
+    the actions are read straight from the mapped file.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as replay_file:
+            self._map = mmap.mmap(replay_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.seed, self.fps = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} Space Rocks replay")
+
+        # offsets of the frame records & frame number to offset of the snapshots taken at the start of that frame
+        self._frame_offsets = []
+        self.snapshots = {}
+        self._scan()
+
+    def __len__(self):
+        return len(self._frame_offsets)
+
+    def _scan(self):
+        data = self._map
+        offset = HEADER.size
+        end = len(data)
+
+        while offset < end:
+            if data[offset] == SNAPSHOT_TAG:
+                # a replay cut off while its last snapshot was being written is played without that snapshot
+                if offset + 1 + SNAPSHOT_LENGTH.size > end:
+                    break
+                (length,) = SNAPSHOT_LENGTH.unpack_from(data, offset + 1)
+                if offset + 1 + SNAPSHOT_LENGTH.size + length > end:
+                    break
+
+                self.snapshots[len(self._frame_offsets)] = offset
+                offset += 1 + SNAPSHOT_LENGTH.size + length
+            else:
+                self._frame_offsets.append(offset)
+                offset += 1
+
+    def actions(self, start=0, stop=None):
+        """
+        Yields the actions of the frames from start up to (not including) stop
+        """
+        data = self._map
+        for offset in self._frame_offsets[start:stop]:
+            yield data[offset]
+
+    def snapshot(self, frame):
+        """
+        :returns: the state of the game at the start of the given frame, if a snapshot was taken then
+        """
+        offset = self.snapshots[frame]
+        (length,) = SNAPSHOT_LENGTH.unpack_from(self._map, offset + 1)
+        start = offset + 1 + SNAPSHOT_LENGTH.size
+        return decode_state(self._map[start:start + length])
+
+    def play(self, frame=None, **game_options):
+        """
+        Simulates the game headless up to the start of the given frame, or to the end of the replay. The simulation
+        starts from the closest snapshot before the frame if there is one.
+        :param game_options: passed on to SpaceRocks, headless is always used
+        :returns: tuple of the game & the SimulationResult of the frames that were simulated
+        """
+        stop = len(self) if frame is None else min(frame, len(self))
+        start = max((snapshot for snapshot in self.snapshots if snapshot <= stop), default=0)
+
+        game = SpaceRocks(headless=True, seed=self.seed, **game_options)
+        if start:
+            game.set_state(self.snapshot(start))
+
+        game.input_source = ScriptedInput(self.actions(start, stop))
+        return game, game.simulate(stop - start)
+
+    def close(self):
+        self._map.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="replay file")
+    parser.add_argument("--frame", type=int, default=None, help="plays the replay up to this frame")
+    args = parser.parse_args()
+
+    replay = Replay(args.path)
+    game, result = replay.play(args.frame)
+    speed = result.fps / replay.fps
+    print(f"seed {replay.seed}, {len(replay)} frames, {len(replay.snapshots)} snapshots")
+    print(f"simulated {result.frames} frames at {result.fps:.0f} frames per second ({speed:.0f}x real time)")
+    print(result.message or "game not finished")
+    replay.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,63 @@
+import random
+from collections import namedtuple
+from time import perf_counter
+
 import pygame
-from utils.asset_utils import load_sprite, load_sound
+from pygame.math import Vector2
+from utils.asset_utils import AssetRegistry, ASSET_MANIFEST
+from utils.audio_utils import AudioSystem, NullAudio
 from utils.game_utils import get_random_position, print_text, get_random_velocity
+from utils.collision_utils import SweepAndPruneBroadPhase
+from utils.render_utils import FlipRenderer
+from utils.camera_utils import Camera, PlayField
+from utils.particle_utils import NullParticles, ParticleSystem, NUMPY_AVAILABLE
+from utils.profile_utils import NullProfiler
+from utils.loop_utils import FixedStepScheduler
+from utils.rotation_utils import RotationAtlas
+from utils.input_utils import KeyboardInput, ScriptedInput, ROTATE_LEFT, ROTATE_RIGHT, THRUST, SHOOT, QUIT
 from models.spaceship import Spaceship
-from models.asteroid import Asteroid
+from models import Appearance
+from models.asteroid import Asteroid, AsteroidSpawner
+from models.bullet import Bullet
+from models.pool import Pool
+
+# Result of a headless simulation, see SpaceRocks.simulate
+SimulationResult = namedtuple("SimulationResult", ["frames", "elapsed", "fps", "message"])
 
 
 class SpaceRocks:
     """
     Defines our game
     MIN_ASTEROID_DISTANCE: constant representing an area that has to remain empty.A value of 250 pixels should be enough
+    MAX_SPAWN_ATTEMPTS: number of random positions tried when looking for an empty spot to spawn an asteroid in
+    SCREEN_SIZE: width & height of the screen, which is also the area the game is played in unless a larger play field
+    is given
+    ASTEROIDS: number of asteroids on a play field the size of the screen, larger play fields get as many asteroids per
+    pixel
+    START_DISTANCE: distance from the middle of the play field the spaceships start at when there are several players
+    ACTIVE_MARGIN: distance around the camera's viewport in which objects are moved every tick, see far_update_interval
+    CAMERA_MARGIN: distance around the camera's viewport in which objects are drawn, objects are drawn between two ticks
+    so they can be slightly off their position
+    FPS: frames per second the game runs at. Every frame moves the game forward by 1/FPS seconds. These are physics
+    frames (ticks), frames are rendered at render_fps, see start_game
     """
 
     MIN_ASTEROID_DISTANCE = 250
-
-    def __init__(self):
+    MAX_SPAWN_ATTEMPTS = 100
+    SCREEN_SIZE = (800, 600)
+    ASTEROIDS = 6
+    START_DISTANCE = 100
+    ACTIVE_MARGIN = 200
+    CAMERA_MARGIN = 16
+    FPS = 60
+
+    def __init__(self, broad_phase=None, world=None, headless=False, seed=None, input_source=None,
+                 renderer=None, pooling=False, profiler=None, render_fps=None, assets=None,
+                 mute=False, field_size=None, far_update_interval=1, players=1, player=0,
+                 particles=None):
         """
         Initialize the game
+        :ivar time_to_first_frame: seconds between creating the game & the first frame being on screen
         :ivar clock: This allows the speed of the game to be controlled and made constant across all processors &
         machines. This allows us to run with a fixed FPS(Frames Per Second) avoiding a situation where the game is
         harder on some machines & easier on others because the speed of objects is different.
@@ -29,33 +71,277 @@ class SpaceRocks:
         SpaceRocks class when the spaceship is initialized. Every time the spaceship creates a bullet, it will
         initialize a Bullet object and then call the callback. The callback will add the bullet to the list of all
         bullets stored by the game.
+
+        :param broad_phase: the broad phase used to find candidate collisions between asteroids & other objects.
+        Defaults to a SweepAndPruneBroadPhase, which keeps the objects sorted along the x axis from one frame to the
+        next. A SpatialHashBroadPhase can be used instead, or a BruteForceBroadPhase to get the old behaviour.
+        :param world: optional models.world.World. When given, every game object is attached to it & all of them are
+        moved in a single vectorized step each frame instead of calling move() on each one of them.
+        :param headless: runs the game without a display, sound or font. Only the game logic is available, see simulate
+        :param seed: seed for the random number generator used by the game, the same seed always gives the same game.
+        When no seed is given a random one is picked, it is available as the seed attribute
+        :param input_source: where the actions of the player come from. Defaults to the keyboard, or to an empty
+        ScriptedInput when running headless
+        :param renderer: how frames are pushed to the display. Defaults to a FlipRenderer, which redraws the whole
+        screen every frame, a DirtyRectRenderer only redraws the parts of the screen that changed
+        :param pooling: reuses bullets & asteroids that left the game through object pools instead of creating new ones,
+        see models.pool. The pools are available as bullet_pool & asteroid_pool
+        :param profiler: times every phase of a frame, see utils.profile_utils.FrameProfiler. Defaults to a
+        NullProfiler, which does nothing
+        :param render_fps: maximum number of frames rendered per second, 0 renders as fast as possible. Defaults to FPS.
+        This does not change how fast the game runs, only how smoothly it is drawn
+        :param assets: AssetRegistry the sprites & sounds come from, games created one after the other can share one so
+        assets are only loaded once
+        :param mute: never initializes the mixer, the game is played without sound. Headless games are always muted.
+        The sounds are played through the audio system available as sounds, see utils.audio_utils
+        :param field_size: width & height of the play field, defaults to SCREEN_SIZE. When it is larger than the screen,
+        the game is shown through a camera following the spaceship & only what is in view is drawn
+        :param far_update_interval: objects further than ACTIVE_MARGIN from the camera's viewport are only moved every
+        far_update_interval ticks, by as many ticks at once, which makes large play fields cheaper to simulate.
+        Collisions of bullets that did not move are not checked either. 1 moves every object every tick. This has no
+        effect without a camera or with a World, which moves every object at once anyway
+        :param players: number of spaceships in the game, one per player. The game is lost once every spaceship has
+        been destroyed. Games with several players are advanced with step(), see lockstep for playing over the network
+        :param player: index of the spaceship controlled by the input source & followed by the camera, available as
+        spaceship
+        :param particles: particle system showing explosions, debris & the exhaust of the spaceships, see
+        utils.particle_utils. Defaults to a ParticleSystem, or to a NullParticles, which shows nothing, when running
+        headless or without numpy
         """
-        self._init_game()
-        self.screen = pygame.display.set_mode((800, 600))
-        self.background = load_sprite("space", False)
-        self.font = pygame.font.Font(None, 64)
+        self.started_at = perf_counter()
+        self.time_to_first_frame = None
+        self.profiler = profiler or NullProfiler()
+        self.headless = headless
+        self.audio = False
+        self.mute = mute or headless
+        self.seed = random.randrange(2 ** 32) if seed is None else seed
+        self.random = random.Random(self.seed)
+        self.input_source = input_source or (ScriptedInput() if headless else KeyboardInput())
+        self.assets = assets or AssetRegistry(convert=not headless)
+
+        if headless:
+            # a plain surface is enough to play on, nothing is ever drawn on it
+            self.screen = pygame.Surface(self.SCREEN_SIZE)
+            self.background = None
+            self.font = None
+            self.overlay_font = None
+        else:
+            # images are decoded in the background while the window opens, sounds once the mixer is ready
+            self.assets.preload_sprites(ASSET_MANIFEST["sprites"])
+            self._init_game()
+            self.screen = pygame.display.set_mode(self.SCREEN_SIZE)
+            if self.audio:
+                self.assets.preload_sounds(ASSET_MANIFEST["sounds"])
+            self.background = self.assets.sprite("space", with_alpha=False)
+            self.font = pygame.font.Font(None, 64)
+            self.overlay_font = pygame.font.Font(None, 24)
+
+        self.sounds = AudioSystem(self.assets) if self.audio else NullAudio()
+        if particles is None:
+            particles = ParticleSystem(seed=self.seed) if NUMPY_AVAILABLE and not headless else NullParticles()
+        self.particles = particles
+        self.field = PlayField(field_size or self.SCREEN_SIZE)
+        self.camera = None
+        if self.field.get_size() != self.SCREEN_SIZE:
+            self.camera = Camera(self.SCREEN_SIZE, self.field)
+        self.far_update_interval = far_update_interval
+        if players > 1 and far_update_interval > 1:
+            # what is close to the camera differs from player to player, but every player has to simulate the same game
+            raise ValueError("far_update_interval can't be used with several players")
         self.message = ""
+        self.asteroids_destroyed = 0
         self.clock = pygame.time.Clock()
+        self.broad_phase = broad_phase or SweepAndPruneBroadPhase()
+        self.renderer = renderer or FlipRenderer()
+        self.render_fps = self.FPS if render_fps is None else render_fps
+        self.world = world
         self.asteroids = []
         self.bullets = []
-        self.spaceship = Spaceship((400, 300), self.bullets.append, sprite=load_sprite("spaceship"),
-                                   bullet_sprite=load_sprite("bullet"),
-                                   laser_sound=load_sound("laser"))
+        self.bullet_pool = Pool(Bullet) if pooling else None
+        self.asteroid_pool = Pool(Asteroid) if pooling else None
+        # every bullet & every asteroid of the same size looks the same, they share their sprite & radius
+        self.bullet_appearance = Appearance(self.assets.sprite("bullet"))
+        self.asteroid_spawner = AsteroidSpawner(self.assets, self._add_asteroid, self.random, self.asteroid_pool,
+                                               self.particles)
+        # the spaceships all rotate the same sprite, so they share the rotated versions of it
+        self.rotation_atlas = RotationAtlas(self.assets.sprite("spaceship"), step=Spaceship.MANEUVERABILITY)
+        self.player = player
+        self.spaceships = [self._create_spaceship(position) for position in self._get_start_positions(players)]
+
+        # the area around the spaceships has to remain empty, the broad phase finds out whether a spawn point is in it
+        self.broad_phase.rebuild(self.spaceships, self.field)
+        field_width, field_height = self.field.get_size()
+        screen_width, screen_height = self.SCREEN_SIZE
+        for _ in range(round(self.ASTEROIDS * field_width * field_height / (screen_width * screen_height))):
+            position = self._get_spawn_position()
+            self._add_asteroid(self._create_asteroid(position, get_random_velocity(1, 3, self.random)))
+
+        # the camera looks up what is in view in the broad phase, which has to be ready before the first frame
+        self.broad_phase.rebuild(self.asteroids, self.field)
+        self._follow_spaceship()
+
+    @property
+    def spaceship(self):
+        """
+        The spaceship of the player, None once it has been destroyed
+        """
+        return self.spaceships[self.player]
 
-        for _ in range(6):
-            while True:
-                position = get_random_position(self.screen)
+    @spaceship.setter
+    def spaceship(self, spaceship):
+        self.spaceships[self.player] = spaceship
 
-                # if the position of an asteroid is larger than the minimal asteroid distance.
-                if position.distance_to(self.spaceship.position) > self.MIN_ASTEROID_DISTANCE:
-                    break
+    def _get_start_positions(self, players):
+        """
+        A single spaceship starts in the middle of the play field, several ones start on a circle around it
+        """
+        middle = Vector2(self.field.get_size()) / 2
+        if players == 1:
+            return [middle]
+        return [middle + Vector2(0, -self.START_DISTANCE).rotate(360 * index / players) for index in range(players)]
+
+    def _get_spawn_position(self):
+        """
+        Picks random positions until one is further than MIN_ASTEROID_DISTANCE from everything in the broad phase. After
+        MAX_SPAWN_ATTEMPTS positions the one furthest from everything is used, so a crowded screen can't keep the game
+        from starting & the asteroid still gets as much room as it can
+        """
+        best_position, best_distance = None, -1
+        for _ in range(self.MAX_SPAWN_ATTEMPTS):
+            position = get_random_position(self.field, self.random)
+
+            # if the position of an asteroid is larger than the minimal asteroid distance.
+            distance = self.broad_phase.nearest_distance(position, self.MIN_ASTEROID_DISTANCE)
+            if distance > self.MIN_ASTEROID_DISTANCE:
+                return position
+            if distance > best_distance:
+                best_position, best_distance = position, distance
+
+        return best_position
+
+    def _create_spaceship(self, position):
+        spaceship = Spaceship(position, self._add_bullet, sprite=self.assets.sprite("spaceship"),
+                              bullet_sprite=self.bullet_appearance,
+                              laser_sound=self.sounds.sound("laser"),
+                              rotation_atlas=self.rotation_atlas,
+                              bullet_pool=self.bullet_pool,
+                              particles=self.particles)
+        if self.world is not None:
+            self.world.add(spaceship)
+        return spaceship
+
+    def _create_asteroid(self, position, velocity, size=3):
+        return self.asteroid_spawner.spawn(position, velocity, size)
+
+    def _create_bullet(self, position, velocity):
+        new_bullet = Bullet if self.bullet_pool is None else self.bullet_pool.acquire
+        return new_bullet(position=position, sprite=self.bullet_appearance, velocity=velocity)
+
+    def get_state(self):
+        """
+        Snapshot of everything needed to continue the game from this point on, made of plain Python values so it can be
+        pickled. Sprites, sounds & the display are not part of it.
+        """
+        spaceships = [
+            (tuple(spaceship.position), tuple(spaceship.velocity), tuple(spaceship.direction)) if spaceship else None
+            for spaceship in self.spaceships
+        ]
+
+        return {
+            "random": self.random.getstate(),
+            "message": self.message,
+            "asteroids_destroyed": self.asteroids_destroyed,
+            "spaceships": spaceships,
+            "asteroids": [(tuple(asteroid.position), tuple(asteroid.velocity), asteroid.size)
+                          for asteroid in self.asteroids],
+            "bullets": [(tuple(bullet.position), tuple(bullet.velocity)) for bullet in self.bullets],
+            # objects far from the camera can be a few ticks behind, see far_update_interval
+            "skipped_ticks": ([asteroid.skipped_ticks for asteroid in self.asteroids],
+                              [bullet.skipped_ticks for bullet in self.bullets]),
+        }
+
+    def set_state(self, state):
+        """
+        Continues the game from a snapshot made by get_state. The same state & the same actions afterwards always give
+        the same game.
+        """
+        self._remove_from_world(self._get_game_objects())
+        if self.asteroid_pool is not None:
+            self.asteroid_pool.release_all(self.asteroids)
+        if self.bullet_pool is not None:
+            self.bullet_pool.release_all(self.bullets)
+        self.asteroids.clear()
+        self.bullets.clear()
+
+        self.random.setstate(state["random"])
+        self.message = state["message"]
+        self.asteroids_destroyed = state["asteroids_destroyed"]
+
+        # states saved before there could be several players have a single spaceship
+        self.spaceships = []
+        for spaceship_state in state.get("spaceships", [state.get("spaceship")]):
+            spaceship = None
+            if spaceship_state is not None:
+                position, velocity, direction = spaceship_state
+                spaceship = self._create_spaceship(position)
+                spaceship.velocity = velocity
+                spaceship.direction = Vector2(direction)
+            self.spaceships.append(spaceship)
+
+        for position, velocity, size in state["asteroids"]:
+            self._add_asteroid(self._create_asteroid(position, velocity, size))
+
+        for position, velocity in state["bullets"]:
+            self._add_bullet(self._create_bullet(position, velocity))
+
+        # states saved before objects could skip ticks have no skipped_ticks
+        skipped_asteroids, skipped_bullets = state.get("skipped_ticks", ((), ()))
+        for game_object, skipped_ticks in zip(self.asteroids + self.bullets, [*skipped_asteroids, *skipped_bullets]):
+            game_object.skipped_ticks = skipped_ticks
+
+        self.broad_phase.rebuild(self.asteroids, self.field)
+        self._follow_spaceship()
+
+    def _follow_spaceship(self, alpha=1.0):
+        """
+        Centers the camera on the spaceship, drawn between the last two ticks when alpha is given. The camera stays
+        where it is once the spaceship is destroyed
+        """
+        if self.camera is not None and self.spaceship:
+            self.camera.follow(self.spaceship.interpolated_position(alpha, self.field))
 
-            self.asteroids.append(
-                Asteroid(position=position, sprite=load_sprite("asteroid"), create_asteroid=self.asteroids.append,
-                         random_velocity=get_random_velocity(1, 3)))
+    def _add_bullet(self, bullet):
+        """
+        Callback used by the spaceship to add the bullets it shoots to the game
+        """
+        self.bullets.append(bullet)
+        if self.world is not None:
+            self.world.add(bullet)
+
+    def _add_asteroid(self, asteroid):
+        """
+        Callback used by the asteroids to add the smaller asteroids they split into to the game
+        """
+        self.asteroids.append(asteroid)
+        if self.world is not None:
+            self.world.add(asteroid)
+
+    def _remove_from_world(self, game_objects):
+        if self.world is not None:
+            for game_object in game_objects:
+                self.world.remove(game_object)
 
     def _init_game(self):
-        pygame.init()
+        # only the parts of pygame the game uses are initialized, pygame.init() would initialize every one of them
+        pygame.display.init()
+        pygame.font.init()
+        if not self.mute:
+            try:
+                pygame.mixer.init()
+                self.audio = True
+            except pygame.error:
+                # no audio device, the game is played without sound
+                self.audio = False
         pygame.display.set_caption("Space Rocks")
 
     def start_game(self):
@@ -70,74 +356,287 @@ class SpaceRocks:
         This part is also responsible for checking if the player has won or lost the game.
         3. drawing. If the game hasn’t ended yet, then this is where the frame will be drawn on screen. 
         It will include all the items that are currently in the game and are visible to the player.
+
+        Input handling & the game engine run at a fixed rate of FPS ticks per second, drawing happens at render_fps.
+        The scheduler decides how many ticks to run before drawing each frame, so the game runs at the same speed no
+        matter how fast frames can be drawn. Frames are drawn with the positions interpolated between the last two
+        ticks, which is why positions are remembered before the last tick of a frame runs.
         """
+        profiler = self.profiler
+        scheduler = FixedStepScheduler(tick_rate=self.FPS)
+
         while True:
+            profiler.begin_frame()
+            ticks, alpha = scheduler.advance()
+
+            for tick in range(ticks):
+                if tick == ticks - 1:
+                    self._remember_positions()
+
+                profiler.start("input")
+                self._handle_input()
+                profiler.stop("input")
+
+                profiler.start("engine")
+                self._game_engine()
+                profiler.stop("engine")
+
+            # sounds triggered by any of the ticks are played once, together
+            self.sounds.flush()
+
+            profiler.start("draw")
+            self._draw(alpha)
+            profiler.stop("draw")
+
+    def _remember_positions(self):
+        for game_object in self._get_game_objects():
+            game_object.remember_position()
+
+    def simulate(self, max_frames):
+        """
+        Runs the game headless, as fast as the CPU allows. Every frame still moves the game forward by exactly 1/FPS
+        seconds, the same fixed timestep used when playing, but nothing is drawn & there is no waiting for the clock.
+        The actions of the player come from the input source.
+        The simulation stops when the game has been won or lost, or after max_frames frames.
+        :returns: a SimulationResult with the number of frames simulated, the wall clock time it took, the simulated
+        frames per second & the message the game ended with (empty if it did not end)
+        """
+        frames = 0
+        profiler = self.profiler
+        start = perf_counter()
+
+        while frames < max_frames and not self.message:
+            profiler.begin_frame()
+
+            profiler.start("input")
             self._handle_input()
+            profiler.stop("input")
+
+            profiler.start("engine")
             self._game_engine()
-            self._draw()
+            profiler.stop("engine")
+
+            frames += 1
+
+        elapsed = perf_counter() - start
+        fps = frames / elapsed if elapsed > 0 else float("inf")
+        return SimulationResult(frames=frames, elapsed=elapsed, fps=fps, message=self.message)
 
     def _handle_input(self):
-        # in each event loop in the game, we get the current event and perform actions based on the event.
-        # pygame.event.get() allows us to get events in each frame of the game.
-        # These can be used to process any type of event. In this case we exit the game if the user process the
-        # ESC button on their keyboard or they exit by closing the game, the X button in the window or pressing
-        # ALT + F4 on Windows or Linux or Cmd+W on MacOS
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
-                quit()
-            elif self.spaceship and event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
-                self.spaceship.shoot()
-
-        is_key_pressed = pygame.key.get_pressed()
-
-        if self.spaceship:
-            if is_key_pressed[pygame.K_RIGHT]:
-                self.spaceship.rotate(clockwise=True)
-            elif is_key_pressed[pygame.K_LEFT]:
-                self.spaceship.rotate(clockwise=False)
-
-            if is_key_pressed[pygame.K_UP]:
-                self.spaceship.accelerate()
+        # the input source turns whatever the player did in this frame into a bitmask of actions, see
+        # utils.input_utils. Reading the keyboard is one such source, a script is another
+        actions = self.input_source.read()
+
+        if actions & QUIT:
+            self._quit()
+
+        self._apply_actions(self.spaceship, actions)
+
+    def _apply_actions(self, spaceship, actions):
+        if spaceship:
+            if actions & SHOOT:
+                spaceship.shoot()
+
+            if actions & ROTATE_RIGHT:
+                spaceship.rotate(clockwise=True)
+            elif actions & ROTATE_LEFT:
+                spaceship.rotate(clockwise=False)
+
+            if actions & THRUST:
+                spaceship.accelerate()
+
+    def step(self, actions):
+        """
+        Plays a single tick of the game with the actions of every player, in the order of the spaceships. Quitting is
+        ignored, the input source is not read. The same state & the same actions always give the same game, which is
+        what lets every player of a networked game simulate it on their own (see lockstep)
+        """
+        for spaceship, player_actions in zip(self.spaceships, actions):
+            self._apply_actions(spaceship, player_actions)
+        self._game_engine()
+
+    def _quit(self):
+        # gives the profiler a chance to export its timings & a recording input source to finish writing before exiting
+        self.profiler.close()
+        close_input = getattr(self.input_source, "close", None)
+        if close_input is not None:
+            close_input()
+        quit()
 
     def _game_engine(self):
         """
         Handles the game logic
         """
+        profiler = self.profiler
+        profiler.start("physics")
+
+        if self.world is not None:
+            # moves all the objects at once, bullets that have left the play field are returned so they can be culled
+            culled_bullets = set(self.world.step(self.field.get_size()))
+        elif self.camera is None or self.far_update_interval == 1:
+            for game_object in self._get_game_objects():
+                game_object.move(self.field)
+        else:
+            self._move_far_objects_less_often()
+
+        self._follow_spaceship()
+
+        profiler.stop("physics")
+        profiler.start("collisions")
+
+        if self.world is None:
+            hit_asteroids, hit_bullets = self._collide()
+        else:
+            hit_asteroids, hit_bullets = self._collide_in_world()
+
+        profiler.stop("collisions")
+
+        if hit_asteroids:
+            self.asteroids_destroyed += len(hit_asteroids)
+            self.asteroids[:] = [asteroid for asteroid in self.asteroids if asteroid not in hit_asteroids]
+            self._remove_from_world(hit_asteroids)
+            if self.asteroid_pool is not None:
+                self.asteroid_pool.release_all(hit_asteroids)
+
+        # Surfaces in Pygame have a get_rect() method that returns a rectangle representing their area.
+        # That rectangle, in turn, has a collidepoint() method that returns True if a point is included in the
+        # rectangle and False otherwise. Using these two methods, you can check if the bullet has left the play field,
+        # and if so, remove it from the list. The world already did this check for us when it moved the bullets.
+        if self.world is None:
+            field_rect = self.field.get_rect()
+            culled_bullets = {bullet for bullet in self.bullets if not field_rect.collidepoint(bullet.position)}
+
+        removed_bullets = hit_bullets | culled_bullets
+        if removed_bullets:
+            self.bullets[:] = [bullet for bullet in self.bullets if bullet not in removed_bullets]
+            self._remove_from_world(removed_bullets)
+            if self.bullet_pool is not None:
+                self.bullet_pool.release_all(removed_bullets)
+
+        if self.world is not None and self.camera is not None:
+            # the collisions with a world do not go through the broad phase, but the camera looks up the asteroids in
+            # view in it
+            self.broad_phase.rebuild(self.asteroids, self.field)
+
+        if not self.asteroids and any(self.spaceships):
+            self.message = "You won!"
 
-        for game_object in self._get_game_objects():
-            game_object.move(self.screen)
+        # particles are only for show, nothing in the game depends on them
+        profiler.start("particles")
+        self.particles.update()
+        profiler.stop("particles")
+
+    def _collide(self):
+        """
+        Finds the asteroids hit by the spaceships & the bullets, the spaceships that are hit are destroyed straight away
+        :returns: tuple of the sets of the asteroids & the bullets that were hit
+        """
+        # the broad phase gives us the few asteroids that are close enough to an object to possibly touch it, only
+        # those go through the (more expensive) narrow phase check in collides_with
+        self.broad_phase.rebuild(self.asteroids, self.field)
 
-        if self.spaceship:
-            for asteroid in self.asteroids:
+        for index, spaceship in enumerate(self.spaceships):
+            if not spaceship:
+                continue
+
+            for asteroid in self.broad_phase.candidates(spaceship):
                 # If any of the asteroids collides with the spaceship, then the spaceship is destroyed.
-                # this setting is represented self.spaceship to None.
-                if asteroid.collides_with(self.spaceship):
-                    self.spaceship = None
-                    self.message = "You lost!"
+                # this setting is represented by setting the spaceship to None.
+                if asteroid.collides_with(spaceship):
+                    self.particles.explosion(spaceship.position, scale=2)
+                    self._remove_from_world([spaceship])
+                    self.spaceships[index] = None
+                    if not any(self.spaceships):
+                        self.message = "You lost!"
                     break
 
-        # Notice that instead of using the original list, self.bullets, we create a copy of it using self.bullets[:]
-        # That’s because removing elements from a list while iterating over it can cause errors.
-        for bullet in self.bullets[:]:
-            for asteroid in self.asteroids[:]:
+        # Instead of removing hit objects from the lists while looping over them (list.remove is linear), they are
+        # collected in sets & the lists are filtered once at the end. Slice assignment is used so that the lists keep
+        # their identity for anything else holding on to them.
+        # Asteroids created by a split are added to the broad phase straight away, so a later bullet in the same frame
+        # can still hit them, just like it could when looping over self.asteroids directly.
+        hit_asteroids = set()
+        hit_bullets = set()
+
+        for bullet in self.bullets:
+            if bullet.skipped_ticks:
+                # the bullet did not move in this tick, see far_update_interval
+                continue
+
+            for asteroid in self.broad_phase.candidates(bullet):
                 if asteroid.collides_with(bullet):
-                    self.asteroids.remove(asteroid)
-                    self.bullets.remove(bullet)
+                    self.particles.explosion(bullet.position, asteroid.scale)
+                    hit_asteroids.add(asteroid)
+                    hit_bullets.add(bullet)
+                    self.broad_phase.remove(asteroid)
+                    spawned_from = len(self.asteroids)
                     asteroid.split()
+                    for child in self.asteroids[spawned_from:]:
+                        self.broad_phase.insert(child)
                     break
 
-        for bullet in self.bullets[:]:
-            # Surfaces in Pygame have a get_rect() method that returns a rectangle representing their area.
-            # That rectangle, in turn, has a collidepoint() method that returns True if a point is included in the
-            # rectangle and False otherwise. Using these two methods, you can check if the bullet has left the screen,
-            # and if so, remove it from the list.
-            if not self.screen.get_rect().collidepoint(bullet.position):
-                self.bullets.remove(bullet)
+        return hit_asteroids, hit_bullets
 
-        if not self.asteroids and self.spaceship:
-            self.message = "You won!"
+    def _collide_in_world(self):
+        """
+        Same as _collide, with the positions & radiuses read straight from the world's arrays, see World.collisions.
+        The hits are resolved in the same order as the broad phase gives them, so the game plays exactly the same: a
+        bullet hits the first asteroid it touches that was not hit yet, in the order of self.asteroids
+        :returns: tuple of the sets of the asteroids & the bullets that were hit
+        """
+        world = self.world
+        asteroids = self.asteroids
+
+        for index, spaceship in enumerate(self.spaceships):
+            if spaceship and world.collisions([spaceship], asteroids)[0]:
+                self.particles.explosion(spaceship.position, scale=2)
+                # removing the spaceship moves another object into its slot, the bullets are looked up after this
+                self._remove_from_world([spaceship])
+                self.spaceships[index] = None
+                if not any(self.spaceships):
+                    self.message = "You lost!"
 
-    def _draw(self):
+        hit_asteroids = set()
+        hit_bullets = set()
+        # the asteroids that are split off in this tick are not in the arrays that were checked, they come after all
+        # the others in self.asteroids & are checked one by one
+        spawned_from = len(asteroids)
+        bullets = [bullet for bullet in self.bullets if not bullet.skipped_ticks]
+
+        for bullet, hits in zip(bullets, world.collisions(bullets, asteroids)):
+            target = next((asteroids[hit] for hit in hits if asteroids[hit] not in hit_asteroids), None)
+            if target is None:
+                target = next((asteroid for asteroid in asteroids[spawned_from:]
+                               if asteroid not in hit_asteroids and asteroid.collides_with(bullet)), None)
+                if target is None:
+                    continue
+
+            self.particles.explosion(bullet.position, target.scale)
+            hit_asteroids.add(target)
+            hit_bullets.add(bullet)
+            target.split()
+
+        return hit_asteroids, hit_bullets
+
+    def _move_far_objects_less_often(self):
+        """
+        Moves the objects close to the camera's viewport every tick & the others every far_update_interval ticks. An
+        object that moves again catches up on all the ticks it skipped at once, whether it is still far away or not
+        """
+        camera = self.camera
+        interval = self.far_update_interval
+        field = self.field
+
+        for game_object in self._get_game_objects():
+            ticks = game_object.skipped_ticks + 1
+            if ticks >= interval or game_object.KIND == Spaceship.KIND or camera.contains(game_object.position,
+                                                                                              self.ACTIVE_MARGIN):
+                game_object.move(field, ticks)
+                game_object.skipped_ticks = 0
+            else:
+                game_object.skipped_ticks = ticks
+
+    def _draw(self, alpha=1.0):
         """
         Draws the content on the screen. It is called on every frame to draw the content on the screen.
         self.screen.fill takes a tuple with three values, representing three base colors: red, green, and blue. 
@@ -148,6 +647,8 @@ class SpaceRocks:
         this method is called on every frame to update the display. Because of this, the screen needs to be filled with
         color every frame,
         as the method will clear the contents generated during the previous frame.
+
+        :param alpha: how far between the previous & the current physics tick objects are drawn, see start_game
         """
         # use this if you want to fill the background with a color
         # self.screen.fill((0,0, 255))
@@ -183,20 +684,65 @@ class SpaceRocks:
         # In this case, the new background has the same size as the screen (800 × 600 pixels), 
         # so the coordinates will be (0, 0), representing the top-left corner of the screen. 
         # That way, the background image will cover the entire screen.
+        # The renderer takes care of drawing the background, either all of it or only the parts that changed.
+        # Everything drawn afterwards gives the renderer the area it was drawn at, see utils.render_utils
+        profiler = self.profiler
+        profiler.start("blit")
+        self.renderer.begin(self.screen, self.background)
+
+        # Asteroids & bullets never rotate, so they are all drawn with a single call to Surface.blits(), which takes a
+        # sequence of (sprite, blit position) pairs. This saves a Python method call & a blit() call per sprite.
+        # The spaceship rotates, it draws itself on top of them
+        screen = self.screen
+        camera = self.camera
+        if camera is None:
+            sprites = [(game_object.sprite, game_object.blit_position(screen, alpha))
+                       for game_objects in (self.asteroids, self.bullets) for game_object in game_objects]
+        else:
+            # only what is in view is drawn. The asteroids in view are looked up in the broad phase, there are only a
+            # few bullets so they are checked one by one
+            self._follow_spaceship(alpha)
+            visible = [asteroid for area in camera.areas(self.CAMERA_MARGIN)
+                       for asteroid in self.broad_phase.query_area(*area)]
+            visible.extend(bullet for bullet in self.bullets if camera.contains(bullet.position, self.CAMERA_MARGIN))
+            sprites = [(game_object.sprite, camera.to_screen(game_object.blit_position(self.field, alpha)))
+                       for game_object in visible]
+
+        rects = screen.blits(sprites, self.renderer.needs_rects)
+        if rects:
+            self.renderer.add_all(rects)
+
+        profiler.start("particle_draw")
+        rects = self.particles.draw(screen, alpha, camera, self.renderer.needs_rects)
+        if rects:
+            self.renderer.add_all(rects)
+        profiler.stop("particle_draw")
+
+        for spaceship in self.spaceships:
+            if spaceship:
+                self.renderer.add(spaceship.draw(screen, alpha, camera))
 
-        self.screen.blit(self.background, (0, 0))
+        if self.message:
+            self.renderer.add(print_text(self.screen, self.message, self.font))
 
-        for game_object in self._get_game_objects():
-            game_object.draw(self.screen)
+        self.renderer.add(profiler.draw_overlay(self.screen, self.overlay_font))
+        profiler.stop("blit")
 
-        if self.message:
-            print_text(self.screen, self.message, self.font)
+        profiler.start("display")
+        self.renderer.end()
+        profiler.stop("display")
 
-        pygame.display.flip()
+        if self.time_to_first_frame is None:
+            # everything is loaded by now, the threads that were loading the assets are no longer needed
+            self.time_to_first_frame = perf_counter() - self.started_at
+            profiler.record("time_to_first_frame", self.time_to_first_frame)
+            self.assets.shutdown()
 
         # This method will wait long enough to match the desired FPS value, passed as an argument.
-        # will control the game and ensure that the game will run at a frame rate of 60 FPS
-        self.clock.tick(60)
+        # will control the game and ensure that frames are drawn at most render_fps times per second, 0 means no limit
+        profiler.start("tick")
+        self.clock.tick(self.render_fps)
+        profiler.stop("tick")
 
     def _get_game_objects(self):
         """
@@ -204,8 +750,6 @@ class SpaceRocks:
         only this single method, or you can exclude some objects from this group if necessary.
         """
         game_objects = [*self.asteroids, *self.bullets]
-
-        if self.spaceship:
-            game_objects.append(self.spaceship)
+        game_objects.extend(spaceship for spaceship in self.spaceships if spaceship)
 
         return game_objects
@@ -1,21 +1,45 @@
+from concurrent.futures import ThreadPoolExecutor
+
 from pygame.image import load
 from pygame.mixer import Sound
+from pygame.transform import rotozoom
 
+# Every asset the game uses, preloaded by name. Whether a sprite has transparent pixels is given when it is asked for
+# (see AssetRegistry.sprite), which is when it gets converted
+ASSET_MANIFEST = {
+    "sprites": ["space", "spaceship", "bullet", "asteroid"],
+    "sounds": ["laser"],
+}
 
-def load_sprite(name: str, with_alpha: bool = True):
-    """
-    Loads a sprite given the name. This will build a path to the sprite and load it
 
-    """
+def sprite_path(name: str):
     # You can find a better way for the extension for the asset to be added
     # this uses .png assets
-    path = f"assets/sprites/{name}.png"
+    return f"assets/sprites/{name}.png"
+
 
+def load_sprite(name: str, with_alpha: bool = True, convert: bool = True):
+    """
+    Loads a sprite given the name. This will build a path to the sprite and load it
+    :param convert: converts the sprite to the pixel format of the display. This needs a display, so headless games
+    pass False & get the sprite as it was decoded from disk
+    """
     # returns a Surface (https://www.pygame.org/docs/ref/surface.html) 
     # that can be used to represent images which can be used to
     # draw on the screen
-    loaded_sprite = load(path)
+    loaded_sprite = load(sprite_path(name))
+
+    if not convert:
+        return loaded_sprite
 
+    return convert_sprite(loaded_sprite, with_alpha)
+
+
+def convert_sprite(loaded_sprite, with_alpha: bool = True):
+    """
+    Converts a loaded sprite to the pixel format of the display, which makes drawing it a lot faster.
+    This needs the display to be set up, so it has to happen on the main thread after pygame.display.set_mode()
+    """
     # converts the image to either be transparent or not.
     # Generally, you could just use convert_alpha() for all types of images since it can also handle an image without
     # transparent pixels.
@@ -29,3 +53,105 @@ def load_sprite(name: str, with_alpha: bool = True):
 def load_sound(name):
     path = f"assets/sounds/{name}.wav"
     return Sound(path)
+
+
+class AssetRegistry:
+    """
+    Loads every asset only once. The first time a sprite or sound is asked for it is loaded from disk (& converted),
+    after that the same object is returned every time. Scaled versions of sprites are kept as well, so that creating
+    lots of asteroids of the same size does not decode or scale any image.
+
+    hits & misses count how many sprite lookups were served from the registry & how many had to load or scale an
+    image, which makes it easy to check that the registry is doing its job during a big wave of asteroids.
+
+    Assets can also be preloaded: decoding images & sounds from disk then happens on a pool of background threads
+    while the game sets up its window. Asking for a preloaded asset waits for it to be decoded, converting sprites
+    still happens on the main thread, the first time they are asked for.
+    """
+
+    def __init__(self, convert: bool = True, workers: int = 4):
+        """
+        :param convert: converts sprites to the pixel format of the display, see load_sprite
+        :param workers: number of threads used to preload assets
+        """
+        self.convert = convert
+        self.workers = workers
+        self.hits = 0
+        self.misses = 0
+        self._sprites = {}
+        self._sounds = {}
+        self._loading_sprites = {}
+        self._loading_sounds = {}
+        self._executor = None
+
+    def preload_sprites(self, names):
+        """
+        Starts decoding the sprites with the given names in the background
+        """
+        for name in names:
+            if name not in self._loading_sprites:
+                self._loading_sprites[name] = self._submit(load, sprite_path(name))
+
+    def preload_sounds(self, names):
+        """
+        Starts loading the sounds with the given names in the background. The mixer has to be initialized first
+        """
+        for name in names:
+            if name not in self._loading_sounds and name not in self._sounds:
+                self._loading_sounds[name] = self._submit(load_sound, name)
+
+    def _submit(self, function, *args):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="assets")
+        return self._executor.submit(function, *args)
+
+    def shutdown(self):
+        """
+        Stops the background threads once everything that was preloaded has been loaded
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def sprite(self, name: str, with_alpha: bool = True, scale: float = 1):
+        """
+        Returns the sprite with the given name, scaled by the given scale.
+        Scaling is done with rotozoom() & an angle of 0 on the full size sprite, never on an already scaled one.
+        """
+        key = (name, with_alpha, scale)
+        sprite = self._sprites.get(key)
+
+        if sprite is not None:
+            self.hits += 1
+            return sprite
+
+        self.misses += 1
+        if scale == 1 and name in self._loading_sprites:
+            # waits for the sprite to be decoded if it is not done yet
+            sprite = self._loading_sprites[name].result()
+            if self.convert:
+                sprite = convert_sprite(sprite, with_alpha)
+        elif scale == 1:
+            sprite = load_sprite(name, with_alpha, self.convert)
+        else:
+            sprite = rotozoom(self.sprite(name, with_alpha), 0, scale)
+
+        self._sprites[key] = sprite
+        return sprite
+
+    def sound(self, name: str):
+        sound = self._sounds.get(name)
+        if sound is None:
+            loading = self._loading_sounds.pop(name, None)
+            sound = loading.result() if loading is not None else load_sound(name)
+            self._sounds[name] = sound
+        return sound
+
+
+class SilentSound:
+    """
+    Stand in for a Sound that plays nothing. Used when running the game headless, where no mixer is initialized.
+    """
+
+    def play(self, *args, **kwargs):
+        return None
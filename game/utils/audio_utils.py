@@ -0,0 +1,136 @@
+from time import perf_counter
+
+import pygame
+
+from utils.asset_utils import SilentSound
+
+
+class _SoundTrigger:
+    """
+    Stand in for a Sound handed out by AudioSystem.sound(). Playing it only asks the audio system to play the sound at
+    the end of the frame.
+    """
+
+    def __init__(self, audio, name):
+        self.audio = audio
+        self.name = name
+
+    def play(self, *args, **kwargs):
+        self.audio.trigger(self.name)
+
+
+class NullAudio:
+    """
+    Audio system that plays nothing. This is what the game uses when it runs headless, has no audio device or is muted,
+    every call is a no-op so sounds cost nothing.
+    """
+    enabled = False
+    # muted audio systems ignore triggers, see lockstep playing ticks again
+    muted = False
+    _silent_sound = SilentSound()
+
+    def sound(self, name):
+        return self._silent_sound
+
+    def trigger(self, name):
+        pass
+
+    def flush(self, now=None):
+        pass
+
+    def stats(self):
+        return {"played": 0, "coalesced": 0, "rate_limited": 0, "cut_off": 0}
+
+
+class AudioSystem(NullAudio):
+    """
+    Plays the sounds of the game on a fixed set of mixer channels.
+
+    Sounds are not played straight away. Triggering a sound only marks it as wanted in this frame & flush(), called once
+    per frame, plays every sound that was triggered. A sound triggered several times in the same frame, by firing a lot
+    of bullets at once for example, is played only once. A sound is not played again until min_interval seconds have
+    passed since it was last played either.
+
+    The channels are allocated up front. A sound plays on the first idle channel, when they are all busy the channels
+    are reused in turn, cutting off the sound that was playing on it.
+    """
+    enabled = True
+    DEFAULT_CHANNELS = 8
+    DEFAULT_MIN_INTERVAL = 0.05
+
+    def __init__(self, assets, channels=DEFAULT_CHANNELS, min_interval=None):
+        """
+        :param assets: AssetRegistry the sounds are loaded from. The mixer has to be initialized first
+        :param channels: number of mixer channels the sounds are played on
+        :param min_interval: dict of sound name to the minimum number of seconds between two plays of that sound, sounds
+        missing from it use DEFAULT_MIN_INTERVAL
+        """
+        self.assets = assets
+        self.min_interval = min_interval or {}
+        pygame.mixer.set_num_channels(channels)
+        self._channels = [pygame.mixer.Channel(index) for index in range(channels)]
+        self._next_channel = 0
+        self._triggers = {}
+        self._pending = []
+        self._last_played = {}
+        self._stats = {"played": 0, "coalesced": 0, "rate_limited": 0, "cut_off": 0}
+
+    def sound(self, name):
+        """
+        Returns an object with a play() method that triggers the sound with the given name
+        """
+        trigger = self._triggers.get(name)
+        if trigger is None:
+            trigger = self._triggers[name] = _SoundTrigger(self, name)
+        return trigger
+
+    def trigger(self, name):
+        if self.muted:
+            return
+        if name in self._pending:
+            self._stats["coalesced"] += 1
+        else:
+            self._pending.append(name)
+
+    def flush(self, now=None):
+        """
+        Plays the sounds triggered since the last flush
+        :param now: current time in seconds, defaults to perf_counter()
+        """
+        if not self._pending:
+            return
+
+        now = perf_counter() if now is None else now
+        for name in self._pending:
+            last_played = self._last_played.get(name)
+            if last_played is not None and now - last_played < self.min_interval.get(name, self.DEFAULT_MIN_INTERVAL):
+                self._stats["rate_limited"] += 1
+                continue
+
+            self._channel().play(self.assets.sound(name))
+            self._last_played[name] = now
+            self._stats["played"] += 1
+
+        self._pending.clear()
+
+    def _channel(self):
+        channels = self._channels
+        count = len(channels)
+
+        for offset in range(count):
+            index = (self._next_channel + offset) % count
+            if not channels[index].get_busy():
+                self._next_channel = (index + 1) % count
+                return channels[index]
+
+        self._stats["cut_off"] += 1
+        channel = channels[self._next_channel]
+        self._next_channel = (self._next_channel + 1) % count
+        return channel
+
+    def stats(self):
+        """
+        :returns: dict with the number of sounds played, coalesced with another trigger of the same sound in the same
+        frame, skipped because of the rate limit & cut off by another sound
+        """
+        return dict(self._stats)
@@ -0,0 +1,103 @@
+import pygame
+
+
+class PlayField:
+    """
+    The area the game is played in. Game objects wrap around its edges (see wrap_position) & bullets are culled once
+    they leave it. It has the same size methods as a Surface, so it can be passed anywhere a surface is only used for
+    its size, but it holds no pixels. That way the play field can be a lot larger than the screen.
+    """
+
+    def __init__(self, size):
+        width, height = size
+        self.size = (int(width), int(height))
+
+    def get_size(self):
+        return self.size
+
+    def get_width(self):
+        return self.size[0]
+
+    def get_height(self):
+        return self.size[1]
+
+    def get_rect(self):
+        return pygame.Rect((0, 0), self.size)
+
+
+class Camera:
+    """
+    The part of the play field that is shown on the screen, when the play field is larger than the screen. The camera
+    is moved with follow() & everything is drawn at the position given by to_screen().
+
+    The play field wraps around its edges, so the viewport can wrap around them as well. areas() gives the parts of the
+    play field inside the viewport as up to 4 rectangles that do not wrap, which a broad phase can be queried with.
+    """
+
+    def __init__(self, size, field):
+        """
+        :param size: width & height of the viewport, the size of the screen
+        :param field: PlayField the camera looks at, it can't be smaller than the viewport
+        """
+        self.width, self.height = size
+        self.field = field
+        if field.get_width() < self.width or field.get_height() < self.height:
+            raise ValueError(f"the play field {field.get_size()} is smaller than the screen {size}")
+
+        self.left = 0.0
+        self.top = 0.0
+
+    def follow(self, position):
+        """
+        Centers the viewport on the given position
+        """
+        x, y = position
+        w, h = self.field.get_size()
+        self.left = (x - self.width / 2) % w
+        self.top = (y - self.height / 2) % h
+
+    def to_screen(self, position):
+        """
+        Returns the position on the screen of the given position on the play field. Positions just outside the left or
+        top of the viewport are given as negative coordinates, instead of wrapping to the far right or bottom of the
+        play field, so sprites partly in view are drawn partly on the screen.
+        """
+        x, y = position
+        w, h = self.field.get_size()
+        screen_x = (x - self.left) % w
+        screen_y = (y - self.top) % h
+        if screen_x > (w + self.width) / 2:
+            screen_x -= w
+        if screen_y > (h + self.height) / 2:
+            screen_y -= h
+        return screen_x, screen_y
+
+    def contains(self, position, margin=0):
+        """
+        Returns whether the given position is inside the viewport grown by margin on every side
+        """
+        x, y = position
+        w, h = self.field.get_size()
+        return ((x - self.left + margin) % w < self.width + 2 * margin and
+                (y - self.top + margin) % h < self.height + 2 * margin)
+
+    def areas(self, margin=0):
+        """
+        Returns the viewport grown by margin on every side as a list of (left, top, right, bottom) rectangles in play
+        field coordinates. The viewport is split where it wraps around the edges of the play field
+        """
+        w, h = self.field.get_size()
+        columns = self._spans(self.left - margin, self.width + 2 * margin, w)
+        rows = self._spans(self.top - margin, self.height + 2 * margin, h)
+        return [(left, top, right, bottom) for left, right in columns for top, bottom in rows]
+
+    @staticmethod
+    def _spans(start, length, size):
+        if length >= size:
+            return [(0, size)]
+
+        start %= size
+        end = start + length
+        if end <= size:
+            return [(start, end)]
+        return [(start, size), (0, end - size)]
@@ -0,0 +1,283 @@
+from bisect import bisect_left, bisect_right
+from math import ceil, floor, inf
+
+from pygame import Vector2
+
+
+def _overlaps_area(game_object, left, top, right, bottom):
+    """
+    Returns whether the square around the game object, of half-size its radius, overlaps the given rectangle
+    """
+    x, y = game_object.position
+    radius = game_object.radius
+    return x + radius >= left and x - radius <= right and y + radius >= top and y - radius <= bottom
+
+
+class BruteForceBroadPhase:
+    """
+    The simplest possible broad phase. Every object that has been inserted is a candidate for every query, which is
+    exactly what the original nested loop in SpaceRocks._game_engine did. This is kept around as a fallback & as a
+    reference to compare the spatial hash against.
+
+    Candidates are always returned in insertion order. The game engine relies on this so that a bullet hits the same
+    asteroid it would have hit when looping over the asteroid list directly.
+    """
+
+    def __init__(self):
+        self._objects = {}
+        self._next_order = 0
+
+    def rebuild(self, game_objects, surface=None):
+        """
+        Clears the broad phase & inserts all the given game objects, in order
+        """
+        self.clear()
+        for game_object in game_objects:
+            self.insert(game_object)
+
+    def clear(self):
+        self._objects = {}
+        self._next_order = 0
+
+    def insert(self, game_object):
+        self._objects[game_object] = self._next_order
+        self._next_order += 1
+
+    def remove(self, game_object):
+        self._objects.pop(game_object, None)
+
+    def candidates(self, game_object):
+        """
+        Returns all the objects that could possibly collide with the given game object, in insertion order
+        """
+        return list(self._objects)
+
+    def is_clear(self, position, distance):
+        """
+        Returns whether no object has its center within distance of the given position, used to find an empty spot to
+        spawn an object in
+        """
+        return self.nearest_distance(position, distance) > distance
+
+    def nearest_distance(self, position, distance):
+        """
+        Returns the distance from the given position to the closest object center within distance of it, or infinity
+        if there is none. Used to pick the emptiest spot to spawn an object in when no spot is clear
+        """
+        position = Vector2(position)
+        return min((nearest for nearest in (position.distance_to(game_object.position) for game_object in self._objects)
+                    if nearest <= distance), default=inf)
+
+    def query_area(self, left, top, right, bottom):
+        """
+        Returns the objects that overlap the given rectangle, in insertion order. Used to find what is in view of the
+        camera, see utils.camera_utils
+        """
+        return [game_object for game_object in self._objects if _overlaps_area(game_object, left, top, right, bottom)]
+
+    def candidate_pairs(self, game_objects):
+        """
+        Yields (game_object, candidate) pairs for every game object passed in. Each pair still has to go through the
+        narrow phase, GameObject.collides_with, to know whether the two objects actually collide.
+        """
+        for game_object in game_objects:
+            for candidate in self.candidates(game_object):
+                yield game_object, candidate
+
+
+class SpatialHashBroadPhase(BruteForceBroadPhase):
+    """
+    Uniform grid spatial hash. The screen is divided into square cells of cell_size pixels & every object is stored in
+    each cell its bounding box overlaps. A query only has to look at the cells around the queried object, so the cost
+    of checking a bullet no longer depends on the number of asteroids on the screen.
+
+    The grid is as large as the surface the game objects wrap around (see wrap_position). Cell coordinates wrap around
+    the same way the positions do, so an object that has just left the screen (a bullet that has not been culled yet)
+    still lands in a valid cell & objects touching an edge are stored in the cells on the opposite edge as well.
+    Wrapping can only ever add candidates, never lose any, so the narrow phase still gives the exact same answers.
+    """
+
+    DEFAULT_CELL_SIZE = 100
+
+    def __init__(self, cell_size=DEFAULT_CELL_SIZE):
+        self.cell_size = cell_size
+        self._columns = 1
+        self._rows = 1
+        self._cells = {}
+        self._max_radius = 0
+        super().__init__()
+
+    def rebuild(self, game_objects, surface=None):
+        if surface is not None:
+            w, h = surface.get_size()
+            self._columns = max(1, ceil(w / self.cell_size))
+            self._rows = max(1, ceil(h / self.cell_size))
+        super().rebuild(game_objects, surface)
+
+    def clear(self):
+        super().clear()
+        self._cells = {}
+        self._max_radius = 0
+
+    def insert(self, game_object):
+        super().insert(game_object)
+        self._max_radius = max(self._max_radius, game_object.radius)
+        for cell in self._cells_for(game_object.position, game_object.radius):
+            self._cells.setdefault(cell, []).append(game_object)
+
+    def remove(self, game_object):
+        if game_object not in self._objects:
+            return
+        super().remove(game_object)
+        for cell in self._cells_for(game_object.position, game_object.radius):
+            bucket = self._cells.get(cell)
+            if bucket and game_object in bucket:
+                bucket.remove(game_object)
+
+    def candidates(self, game_object):
+        found = set()
+        for cell in self._cells_for(game_object.position, game_object.radius + self._max_radius):
+            found.update(self._cells.get(cell, ()))
+
+        # the original loop visits objects in list order, sorting by insertion order keeps results identical
+        order = self._objects
+        return sorted((candidate for candidate in found if candidate in order), key=order.__getitem__)
+
+    def nearest_distance(self, position, distance):
+        position = Vector2(position)
+        found = set()
+        for cell in self._cells_for(position, distance):
+            found.update(self._cells.get(cell, ()))
+
+        # wrapped cells can only add objects, the distance check below is the same as the brute force one
+        return min((nearest for nearest in (position.distance_to(game_object.position)
+                                            for game_object in found if game_object in self._objects)
+                    if nearest <= distance), default=inf)
+
+    def query_area(self, left, top, right, bottom):
+        # the square around the center of the rectangle covers all of it, the exact check is done afterwards
+        center = ((left + right) / 2, (top + bottom) / 2)
+        half_size = max(right - left, bottom - top) / 2
+        found = set()
+        for cell in self._cells_for(center, half_size + self._max_radius):
+            found.update(self._cells.get(cell, ()))
+
+        order = self._objects
+        return sorted((game_object for game_object in found
+                       if game_object in order and _overlaps_area(game_object, left, top, right, bottom)),
+                      key=order.__getitem__)
+
+    def _cells_for(self, position, radius):
+        """
+        Returns the set of (wrapped) cells covered by a square of half-size radius centered at the given position
+        """
+        x, y = position
+        size = self.cell_size
+        first_column, last_column = floor((x - radius) / size), floor((x + radius) / size)
+        first_row, last_row = floor((y - radius) / size), floor((y + radius) / size)
+
+        # once a box spans the whole grid, every cell is covered. Clamping here avoids looping over the same
+        # wrapped cells over & over again for very large radiuses
+        last_column = min(last_column, first_column + self._columns - 1)
+        last_row = min(last_row, first_row + self._rows - 1)
+
+        return {
+            (column % self._columns, row % self._rows)
+            for column in range(first_column, last_column + 1)
+            for row in range(first_row, last_row + 1)
+        }
+
+
+class SweepAndPruneBroadPhase(BruteForceBroadPhase):
+    """
+    Sweep & prune along the x axis. Objects are kept sorted by the x coordinate of their center, a query only has to
+    look at the objects whose x coordinate is within reach of the queried area, found with a binary search.
+
+    The sorted order is kept from one rebuild to the next. Objects only move a few pixels per frame, so the order barely
+    changes & re-sorting the nearly sorted list is close to linear (list.sort takes advantage of the runs that are
+    already in order). Objects inserted or removed in between rebuilds, asteroids created by a split for example, are
+    put in place with a binary search as well.
+
+    Like the narrow phase, queries do not wrap around the edges of the screen.
+    """
+
+    def __init__(self):
+        self._sorted = []
+        self._xs = []
+        self._max_radius = 0
+        super().__init__()
+
+    def rebuild(self, game_objects, surface=None):
+        self._objects = {game_object: order for order, game_object in enumerate(game_objects)}
+        self._next_order = len(self._objects)
+
+        # objects still in the game keep the order they were sorted in last time, new ones are added at the end
+        objects = [game_object for game_object in self._sorted if game_object in self._objects]
+        if len(objects) != len(self._objects):
+            known = set(objects)
+            objects.extend(game_object for game_object in self._objects if game_object not in known)
+
+        xs = [game_object.position[0] for game_object in objects]
+        indices = sorted(range(len(objects)), key=xs.__getitem__)
+        self._sorted = [objects[index] for index in indices]
+        self._xs = [xs[index] for index in indices]
+        self._max_radius = max((game_object.radius for game_object in objects), default=0)
+
+    def clear(self):
+        super().clear()
+        self._sorted = []
+        self._xs = []
+        self._max_radius = 0
+
+    def insert(self, game_object):
+        super().insert(game_object)
+        self._max_radius = max(self._max_radius, game_object.radius)
+        x = game_object.position[0]
+        index = bisect_right(self._xs, x)
+        self._xs.insert(index, x)
+        self._sorted.insert(index, game_object)
+
+    def remove(self, game_object):
+        if game_object not in self._objects:
+            return
+        super().remove(game_object)
+
+        # the object has not moved since it was sorted, so it is among the objects with the same x coordinate
+        index = bisect_left(self._xs, game_object.position[0])
+        if index >= len(self._sorted) or self._sorted[index] is not game_object:
+            index = self._sorted.index(game_object)
+        del self._xs[index]
+        del self._sorted[index]
+
+    def candidates(self, game_object):
+        x, y = game_object.position
+        reach = game_object.radius + self._max_radius
+        found = [
+            candidate for candidate in self._within(x - reach, x + reach) if abs(candidate.position[1] - y) <= reach
+        ]
+
+        # the original loop visits objects in list order, sorting by insertion order keeps results identical
+        return sorted(found, key=self._objects.__getitem__)
+
+    def nearest_distance(self, position, distance):
+        """
+        Returns the distance to the closest object center within distance of the given position, exactly like checking
+        distance_to against every object would
+        """
+        position = Vector2(position)
+        nearby = self._within(position.x - distance, position.x + distance)
+        return min((nearest for nearest in (position.distance_to(game_object.position) for game_object in nearby)
+                    if nearest <= distance), default=inf)
+
+    def query_area(self, left, top, right, bottom):
+        found = [
+            game_object for game_object in self._within(left - self._max_radius, right + self._max_radius)
+            if _overlaps_area(game_object, left, top, right, bottom)
+        ]
+        return sorted(found, key=self._objects.__getitem__)
+
+    def _within(self, first_x, last_x):
+        """
+        Returns the objects with the x coordinate of their center between first_x & last_x, sorted along the x axis
+        """
+        return self._sorted[bisect_left(self._xs, first_x):bisect_right(self._xs, last_x)]
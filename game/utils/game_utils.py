@@ -19,30 +19,40 @@ def wrap_position(position: tuple, surface):
     return Vector2(x % w, y % h)
 
 
-def get_random_position(surface):
+def get_random_position(surface, rng=random):
     """
     This will generate a random set of coordinates on a given surface and return the result as a Vector2 instance.
+    :param rng: source of randomness, a seeded random.Random can be passed in to get reproducible positions
     """
     return Vector2(
-        random.randrange(surface.get_width()),
-        random.randrange(surface.get_height()),
+        rng.randrange(surface.get_width()),
+        rng.randrange(surface.get_height()),
     )
 
 
-def get_random_velocity(min_speed, max_speed):
+def get_random_velocity(min_speed, max_speed, rng=random):
     """
     The method will generate a random value between min_speed and max_speed and a random angle between 0 and 360 degrees
     Then it will create a vector with that value, rotated by that angle.
+    :param rng: source of randomness, a seeded random.Random can be passed in to get reproducible velocities
     """
-    speed = random.randint(min_speed, max_speed)
-    angle = random.randrange(0, 360)
+    speed = rng.randint(min_speed, max_speed)
+    angle = rng.randrange(0, 360)
     return Vector2(speed, 0).rotate(angle)
 
 
-def print_text(surface, text, font, color=Color("tomato")):
+def print_text(surface, text, font, color=Color("tomato"), position=None):
+    """
+    Prints the text in the center of the surface
+    :param position: prints the text with its top left corner at this position instead
+    :returns: the area of the surface the text was printed on
+    """
     text_surface = font.render(text, False, color)
 
     rect = text_surface.get_rect()
-    rect.center = Vector2(surface.get_size()) / 2
+    if position is None:
+        rect.center = Vector2(surface.get_size()) / 2
+    else:
+        rect.topleft = position
 
-    surface.blit(text_surface, rect)
+    return surface.blit(text_surface, rect)
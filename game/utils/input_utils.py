@@ -0,0 +1,80 @@
+import pygame
+
+# Every action the player can take in a frame is a single bit, the actions taken in a frame are combined in a bitmask.
+# This keeps the input of a frame small & easy to record, replay or generate from a script.
+ROTATE_LEFT = 1
+ROTATE_RIGHT = 2
+THRUST = 4
+SHOOT = 8
+QUIT = 16
+
+
+class KeyboardInput:
+    """
+    Reads the actions of the player from the keyboard. This is the input source used when playing the game.
+    """
+
+    def read(self) -> int:
+        """
+        Returns the bitmask of actions taken by the player in this frame.
+
+        in each event loop in the game, we get the current event and perform actions based on the event.
+        pygame.event.get() allows us to get events in each frame of the game.
+        These can be used to process any type of event. In this case we quit the game if the user process the
+        ESC button on their keyboard or they exit by closing the game, the X button in the window or pressing
+        ALT + F4 on Windows or Linux or Cmd+W on MacOS
+        """
+        actions = 0
+
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                actions |= QUIT
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
+                actions |= SHOOT
+
+        is_key_pressed = pygame.key.get_pressed()
+
+        if is_key_pressed[pygame.K_RIGHT]:
+            actions |= ROTATE_RIGHT
+        elif is_key_pressed[pygame.K_LEFT]:
+            actions |= ROTATE_LEFT
+
+        if is_key_pressed[pygame.K_UP]:
+            actions |= THRUST
+
+        return actions
+
+
+class ScriptedInput:
+    """
+    Plays back a scripted sequence of action bitmasks, one per frame. Once the script runs out, no more actions are
+    taken. This is used to drive the game without a keyboard, for example in headless simulations.
+    """
+
+    def __init__(self, actions=()):
+        self._actions = iter(actions)
+        self.exhausted = False
+
+    def read(self) -> int:
+        if self.exhausted:
+            return 0
+
+        actions = next(self._actions, None)
+        if actions is None:
+            self.exhausted = True
+            return 0
+
+        return actions
+
+
+class PolicyInput:
+    """
+    Asks a policy, a bot, what to do every frame. The policy is called with the game & returns a bitmask of actions.
+    """
+
+    def __init__(self, policy, game=None):
+        self.policy = policy
+        self.game = game
+
+    def read(self) -> int:
+        return self.policy(self.game)
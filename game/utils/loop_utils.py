@@ -0,0 +1,54 @@
+from time import perf_counter
+
+
+class FixedStepScheduler:
+    """
+    Decides how many physics ticks to run for every rendered frame. Everything that moves in the game moves by a fixed
+    amount per tick (velocities, Spaceship.ACCELERATION, Spaceship.MANEUVERABILITY), so the physics have to run at a
+    fixed tick rate for the game to run at the same speed everywhere, no matter how fast frames can be rendered.
+
+    The time that passed since the previous frame is added to an accumulator & a tick is run for every 1 / tick_rate
+    seconds in it. When rendering can't keep up, several ticks are run before the next frame is rendered, dropping
+    render frames instead of slowing down the game. When rendering is faster than the tick rate, some frames run no
+    tick at all & what is left in the accumulator is used to interpolate between the last two physics states.
+
+    To avoid never catching up again after a long hitch (the so called spiral of death), no more than max_frame_time
+    seconds are added to the accumulator per frame. Only a hitch longer than that slows the game down.
+    """
+
+    def __init__(self, tick_rate=60, max_frame_time=0.25, clock=perf_counter):
+        """
+        :param tick_rate: physics ticks per second
+        :param max_frame_time: most time, in seconds, a single frame can add to the accumulator
+        :param clock: returns the current time in seconds
+        """
+        self.tick_rate = tick_rate
+        self.tick_duration = 1 / tick_rate
+        self.max_frame_time = max_frame_time
+        self.clock = clock
+        self.ticks = 0
+        self.frames = 0
+        self._accumulator = 0.0
+        self._previous_time = None
+
+    def advance(self):
+        """
+        Called once per rendered frame.
+        :returns: tuple of the number of ticks to run before rendering & the interpolation factor, between 0 & 1, to
+        render with once they have run
+        """
+        now = self.clock()
+        if self._previous_time is None:
+            # the very first frame runs a single tick
+            frame_time = self.tick_duration
+        else:
+            frame_time = min(now - self._previous_time, self.max_frame_time)
+        self._previous_time = now
+
+        self._accumulator += frame_time
+        ticks = int(self._accumulator // self.tick_duration)
+        self._accumulator -= ticks * self.tick_duration
+
+        self.ticks += ticks
+        self.frames += 1
+        return ticks, self._accumulator / self.tick_duration
@@ -0,0 +1,222 @@
+import math
+
+import pygame
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+NUMPY_AVAILABLE = np is not None
+
+
+class ParticleStyle:
+    """
+    How the particles of an effect look: a color & a size in pixels. Particles are drawn with tiny surfaces made once
+    per style, one per step of fading out, so drawing a particle is a single blit of a surface that already exists.
+    """
+    __slots__ = ("color", "size", "sprites")
+
+    def __init__(self, color, size, fade_steps):
+        self.color = pygame.Color(color)
+        self.size = size
+        self.sprites = []
+        for step in range(fade_steps):
+            sprite = pygame.Surface((size, size))
+            sprite.fill(self.color)
+            # a surface wide alpha blits a lot faster than per pixel alpha
+            sprite.set_alpha(round(255 * (fade_steps - step) / fade_steps))
+            self.sprites.append(sprite)
+
+
+class NullParticles:
+    """
+    Particle system that shows nothing. This is what the game uses when it runs headless or numpy is not installed,
+    every call is a no-op so effects cost nothing.
+    """
+    enabled = False
+
+    def __init__(self):
+        # turned off while ticks are played again by lockstep, their effects were shown the first time around
+        self.emitting = True
+
+    def __len__(self):
+        return 0
+
+    def explosion(self, position, scale=1.0):
+        pass
+
+    def debris(self, position, size):
+        pass
+
+    def trail(self, position, velocity, direction, distance):
+        pass
+
+    def update(self):
+        pass
+
+    def draw(self, surface, alpha=1.0, camera=None, needs_rects=True):
+        return None
+
+
+class ParticleSystem(NullParticles):
+    """
+    Explosions, debris & thrust trails made of many short lived particles.
+
+    A particle is not an object: the particles are stored in preallocated NumPy arrays (a struct of arrays, like the
+    World) & update() ages & moves all of them at once with a handful of vectorized operations. The arrays are used as a
+    ring buffer, new particles take the slots after the last ones emitted & once it wraps around, the oldest particles
+    are overwritten. So there can never be more than capacity particles, however much is going on.
+
+    Particles are only for show. They have their own source of randomness & nothing in the game depends on them, so
+    the game plays exactly the same with or without them.
+
+    This requires numpy, which is an optional dependency of the game.
+    """
+    enabled = True
+    DEFAULT_CAPACITY = 2048
+    FADE_STEPS = 8
+    # particles slow down a little every tick, explosions spread out quickly & then drift
+    DRAG = 0.95
+
+    SPARK = 0
+    FLAME = 1
+    DEBRIS = 2
+    STYLES = {
+        SPARK: ("#fff3b0", 2),
+        FLAME: ("#ff8c1a", 3),
+        DEBRIS: ("#a39a8c", 2),
+    }
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, seed=None):
+        """
+        :param capacity: maximum number of live particles
+        :param seed: seeds the randomness of the particles, which is separate from the one of the game
+        """
+        if np is None:
+            raise ImportError("ParticleSystem requires numpy, install it with `pipenv install numpy`")
+        super().__init__()
+
+        self.capacity = capacity
+        self.positions = np.zeros((capacity, 2), dtype=np.float32)
+        self.velocities = np.zeros((capacity, 2), dtype=np.float32)
+        self.ages = np.zeros(capacity, dtype=np.int32)
+        self.lifetimes = np.zeros(capacity, dtype=np.int32)
+        self.styles = np.zeros(capacity, dtype=np.int32)
+        # number of live particles that had to make room for new ones
+        self.overwritten = 0
+
+        styles = [ParticleStyle(color, size, self.FADE_STEPS) for color, size in self.STYLES.values()]
+        self._sprites = [sprite for style in styles for sprite in style.sprites]
+        self._half_sizes = np.array([style.size / 2 for style in styles], dtype=np.float32)
+        self._random = np.random.default_rng(seed)
+        self._next_slot = 0
+        # ticks until every particle is dead, nothing needs updating or drawing after that
+        self._ticks_left = 0
+
+    def __len__(self):
+        if not self._ticks_left:
+            return 0
+        return int(np.count_nonzero(self.ages < self.lifetimes))
+
+    def emit(self, style, position, count, speed, lifetime, velocity=(0, 0), direction=None, spread=180):
+        """
+        Adds count particles of the given style at the given position
+        :param speed: (minimum, maximum) speed of the particles, in pixels per tick
+        :param lifetime: (minimum, maximum) number of ticks the particles live
+        :param velocity: velocity of whatever emits the particles, added to the velocity of every particle
+        :param direction: the particles go in this direction, give or take spread degrees. Without a direction they go
+        every which way
+        """
+        if not self.emitting or count <= 0:
+            return
+
+        count = min(count, self.capacity)
+        rng = self._random
+        angles = rng.uniform(-math.radians(spread), math.radians(spread), count)
+        if direction is not None:
+            angles += math.atan2(direction[1], direction[0])
+        speeds = rng.uniform(*speed, count)
+
+        slots = (self._next_slot + np.arange(count)) % self.capacity
+        self._next_slot = (self._next_slot + count) % self.capacity
+        self.overwritten += int(np.count_nonzero(self.ages[slots] < self.lifetimes[slots]))
+
+        self.positions[slots] = position
+        self.velocities[slots, 0] = np.cos(angles) * speeds + velocity[0]
+        self.velocities[slots, 1] = np.sin(angles) * speeds + velocity[1]
+        self.ages[slots] = 0
+        self.lifetimes[slots] = rng.integers(lifetime[0], lifetime[1] + 1, count)
+        self.styles[slots] = style
+        self._ticks_left = max(self._ticks_left, lifetime[1])
+
+    def explosion(self, position, scale=1.0):
+        """
+        Sparks & flames flying off in every direction, larger explosions for larger scales
+        """
+        self.emit(self.SPARK, position, round(24 * scale), speed=(0.5, 3 * scale), lifetime=(10, 30))
+        self.emit(self.FLAME, position, round(10 * scale), speed=(0.2, 1.5 * scale), lifetime=(8, 20))
+
+    def debris(self, position, size):
+        """
+        Bits of rock of an asteroid of the given size that was hit
+        """
+        self.emit(self.DEBRIS, position, 6 * size, speed=(0.3, 1.5), lifetime=(20, 45))
+
+    def trail(self, position, velocity, direction, distance):
+        """
+        Exhaust of an engine at distance behind the given position, going the opposite way of direction
+        """
+        x, y = position
+        dx, dy = direction
+        self.emit(self.FLAME, (x - dx * distance, y - dy * distance), 2, speed=(1, 2.5), lifetime=(6, 14),
+                  velocity=velocity, direction=(-dx, -dy), spread=15)
+
+    def update(self):
+        """
+        Ages & moves every particle by a tick. Dead particles are moved as well, moving all of them is cheaper than
+        picking out the live ones
+        """
+        if not self._ticks_left:
+            return
+
+        self._ticks_left -= 1
+        self.positions += self.velocities
+        self.velocities *= self.DRAG
+        self.ages += 1
+
+    def draw(self, surface, alpha=1.0, camera=None, needs_rects=True):
+        """
+        Draws the live particles that are on the surface, or in view of the camera, with a single Surface.blits() call
+        :param alpha: how far between the previous & the current physics tick particles are drawn
+        :returns: the areas drawn on, if needs_rects
+        """
+        if not self._ticks_left:
+            return None
+
+        live = np.flatnonzero(self.ages < self.lifetimes)
+        if not live.size:
+            return None
+
+        styles = self.styles[live]
+        positions = self.positions[live] - self.velocities[live] * (1 - alpha)
+        if camera is None:
+            width, height = surface.get_size()
+        else:
+            # particles are tiny, the ones partly in view at the top or left edges are not worth drawing
+            width, height = camera.width, camera.height
+            positions -= (camera.left, camera.top)
+            positions %= camera.field.get_size()
+        positions -= self._half_sizes[styles, None]
+
+        x, y = positions.T
+        visible = (x >= 0) & (x < width) & (y >= 0) & (y < height)
+        if not visible.any():
+            return None
+
+        live = live[visible]
+        fade = self.ages[live] * self.FADE_STEPS // self.lifetimes[live]
+        indexes = (styles[visible] * self.FADE_STEPS + fade).tolist()
+        sprites = self._sprites
+        blits = [(sprites[index], position) for index, position in zip(indexes, positions[visible].tolist())]
+        return surface.blits(blits, needs_rects)
@@ -0,0 +1,211 @@
+import csv
+import json
+from time import perf_counter
+
+from pygame import Color
+
+from utils.game_utils import print_text
+
+
+class RingBuffer:
+    """
+    Fixed size buffer of the most recent samples. Once it is full, every new sample overwrites the oldest one, so it
+    never grows no matter how long the game runs.
+    """
+
+    def __init__(self, size):
+        self._samples = [0.0] * size
+        self._index = 0
+        self.count = 0
+
+    def __len__(self):
+        return min(self.count, len(self._samples))
+
+    def append(self, sample):
+        self._samples[self._index] = sample
+        self._index = (self._index + 1) % len(self._samples)
+        self.count += 1
+
+    def samples(self):
+        return self._samples[:len(self)]
+
+    def percentiles(self, percents):
+        """
+        :returns: the given percentiles of the samples in the buffer, using the nearest rank method
+        """
+        samples = sorted(self.samples())
+        if not samples:
+            return [0.0 for _ in percents]
+
+        last = len(samples) - 1
+        return [samples[min(last, int(round(percent / 100 * last)))] for percent in percents]
+
+
+class _Section:
+    """
+    Context manager timing a single section of a frame
+    """
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.profiler.start(self.name)
+
+    def __exit__(self, *exc_info):
+        self.profiler.stop(self.name)
+
+
+class _NullSection:
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+class NullProfiler:
+    """
+    Profiler that does nothing. This is what the game uses when profiling is turned off, every call is a no-op so the
+    instrumentation in the game loop costs next to nothing.
+    """
+    enabled = False
+    _section = _NullSection()
+
+    def begin_frame(self):
+        pass
+
+    def start(self, name):
+        pass
+
+    def stop(self, name):
+        pass
+
+    def record(self, name, duration):
+        pass
+
+    def section(self, name):
+        return self._section
+
+    def draw_overlay(self, surface, font):
+        return None
+
+    def close(self):
+        pass
+
+
+class FrameProfiler(NullProfiler):
+    """
+    Times each phase of a frame. Sections are timed with start()/stop() or the section() context manager & the last
+    history durations of every section are kept in a RingBuffer, from which rolling percentiles are computed.
+
+    The "frame" section is the time from one begin_frame() to the next, so it includes waiting on the clock.
+
+    The timings can be drawn over the game with draw_overlay() & are written to export_path when the profiler is
+    closed, as JSON or CSV depending on the extension of the path.
+    """
+    enabled = True
+    PERCENTILES = (50, 95, 99)
+    OVERLAY_COLOR = Color("white")
+
+    def __init__(self, history=600, export_path=None, overlay=False, overlay_refresh=30):
+        """
+        :param history: number of samples kept per section
+        :param export_path: file the summary is written to when the profiler is closed, .json or .csv
+        :param overlay: draws the timings on the screen
+        :param overlay_refresh: number of frames between updates of the overlay, computing percentiles every frame
+        would be more expensive than some of the sections being timed
+        """
+        self.history = history
+        self.export_path = export_path
+        self.overlay = overlay
+        self.overlay_refresh = overlay_refresh
+        self.sections = {}
+        self._started = {}
+        self._frame_start = None
+        self._frames = 0
+        self._overlay_lines = []
+
+    def _buffer(self, name):
+        buffer = self.sections.get(name)
+        if buffer is None:
+            buffer = self.sections[name] = RingBuffer(self.history)
+        return buffer
+
+    def begin_frame(self):
+        now = perf_counter()
+        if self._frame_start is not None:
+            self._buffer("frame").append(now - self._frame_start)
+        self._frame_start = now
+        self._frames += 1
+
+    def start(self, name):
+        self._started[name] = perf_counter()
+
+    def stop(self, name):
+        self._buffer(name).append(perf_counter() - self._started.pop(name))
+
+    def record(self, name, duration):
+        """
+        Adds a duration, in seconds, measured some other way, for example the time to first frame of the game
+        """
+        self._buffer(name).append(duration)
+
+    def section(self, name):
+        return _Section(self, name)
+
+    def summary(self):
+        """
+        :returns: dict of section name to a dict with the number of samples, mean, percentiles & maximum, in milliseconds
+        """
+        summary = {}
+        for name, buffer in self.sections.items():
+            samples = buffer.samples()
+            stats = {"samples": buffer.count, "mean_ms": sum(samples) / len(samples) * 1000 if samples else 0.0}
+            for percent, value in zip(self.PERCENTILES, buffer.percentiles(self.PERCENTILES)):
+                stats[f"p{percent}_ms"] = value * 1000
+            stats["max_ms"] = max(samples, default=0.0) * 1000
+            summary[name] = stats
+        return summary
+
+    def draw_overlay(self, surface, font):
+        """
+        Draws a line per section in the top left corner of the surface
+        :returns: the area of the surface that was drawn on
+        """
+        if not self.overlay:
+            return None
+
+        if not self._overlay_lines or self._frames % self.overlay_refresh == 0:
+            self._overlay_lines = [
+                f"{name}: {stats['p50_ms']:.2f} / {stats['p95_ms']:.2f} / {stats['p99_ms']:.2f} ms"
+                for name, stats in self.summary().items()
+            ]
+
+        area = None
+        line_height = font.get_linesize()
+        for line_number, line in enumerate(self._overlay_lines):
+            rect = print_text(surface, line, font, self.OVERLAY_COLOR, position=(8, 8 + line_number * line_height))
+            area = rect if area is None else area.union(rect)
+        return area
+
+    def export(self, path):
+        """
+        Writes the summary to the given path, as CSV if it ends with .csv & JSON otherwise
+        """
+        summary = self.summary()
+
+        with open(path, "w", newline="") as export_file:
+            if str(path).endswith(".csv"):
+                fields = ["section", "samples", "mean_ms"] + [f"p{percent}_ms" for percent in self.PERCENTILES]
+                writer = csv.DictWriter(export_file, fieldnames=fields + ["max_ms"])
+                writer.writeheader()
+                for name, stats in summary.items():
+                    writer.writerow({"section": name, **stats})
+            else:
+                json.dump(summary, export_file, indent=2)
+
+    def close(self):
+        if self.export_path:
+            self.export(self.export_path)
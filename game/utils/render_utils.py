@@ -0,0 +1,85 @@
+import pygame
+
+
+class FlipRenderer:
+    """
+    Redraws the whole screen every frame. The background is blitted over the entire screen, everything is drawn on top
+    of it & pygame.display.flip() pushes the whole screen to the display.
+
+    A renderer is used in 3 steps every frame: begin() prepares the screen, add() is called with the area of everything
+    that gets drawn & end() pushes the frame to the display.
+
+    needs_rects tells whether the renderer uses the areas given to add() at all, when it does not they don't need to be
+    collected (see Surface.blits)
+    """
+    needs_rects = False
+
+    def begin(self, screen, background):
+        screen.blit(background, (0, 0))
+
+    def add(self, rect):
+        pass
+
+    def add_all(self, rects):
+        pass
+
+    def end(self):
+        pygame.display.flip()
+
+
+class DirtyRectRenderer:
+    """
+    Only redraws the parts of the screen that changed. Every frame, the areas that were drawn on in the previous frame are
+    restored from the background, everything is drawn again & only the old & new areas are pushed to the display with
+    pygame.display.update(rects). When only a few small sprites move on a large screen this is a lot less work than
+    redrawing the whole screen.
+
+    Objects that wrap around the edges of the screen need no special handling, the area an object was drawn at on one
+    edge is restored & the area it is drawn at on the opposite edge is updated. The rectangles returned by blit() are
+    already clipped to the screen.
+
+    The first frame & any frame after reset() redraws the whole screen, just like the FlipRenderer.
+    """
+    needs_rects = True
+
+    def __init__(self):
+        self.screen = None
+        self.background = None
+        self._previous_rects = []
+        self._rects = []
+        self._full_redraw = True
+
+    def reset(self):
+        """
+        Forces the whole screen to be redrawn on the next frame, for example after the background changed
+        """
+        self._previous_rects = []
+        self._full_redraw = True
+
+    def begin(self, screen, background):
+        self.screen = screen
+        self.background = background
+        self._rects = []
+
+        if self._full_redraw:
+            screen.blit(background, (0, 0))
+        else:
+            # the area argument of blit() only copies that part of the background, at the same place on the screen
+            for rect in self._previous_rects:
+                screen.blit(background, rect, rect)
+
+    def add(self, rect):
+        if rect:
+            self._rects.append(rect)
+
+    def add_all(self, rects):
+        self._rects.extend(rect for rect in rects if rect)
+
+    def end(self):
+        if self._full_redraw:
+            pygame.display.flip()
+            self._full_redraw = False
+        else:
+            pygame.display.update(self._previous_rects + self._rects)
+
+        self._previous_rects = self._rects
@@ -0,0 +1,76 @@
+from collections import OrderedDict
+
+from pygame.math import Vector2
+from pygame.transform import rotozoom
+
+
+class RotationAtlas:
+    """
+    Cache of the rotated versions of a sprite. Rotating a sprite with rotozoom() is expensive & allocates a new Surface,
+    doing that every frame for every rotating object adds up quickly.
+
+    Angles are snapped to multiples of step degrees. The sign of the angle is kept: -3 & 357 degrees face the same way,
+    but rotozoom() does not give the exact same pixels for both, so they are cached separately. That makes at most
+    2 * 360 / step - 1 different rotated surfaces for the angles between -360 & 360 degrees, which is what
+    Vector2.angle_to() returns. The spaceship, for example, can only ever face multiples of its MANEUVERABILITY, so
+    using that as the step gives the same image as rotating the sprite by its angle every frame.
+
+    Rotated surfaces are created lazily the first time an angle is asked for & kept in a least recently used cache of
+    at most max_size entries. preload() renders all of them up front instead.
+    """
+
+    def __init__(self, sprite, step=1.0, max_size=None):
+        """
+        :param sprite: the sprite to rotate
+        :param step: angles are rounded to a multiple of this many degrees
+        :param max_size: maximum number of rotated surfaces kept around, defaults to one per possible angle
+        """
+        self.sprite = sprite
+        self.step = step
+        # number of steps in a full turn, the keys of the angles between -360 & 360 degrees are strictly between
+        # -turn & turn
+        self.turn = max(1, round(360 / step))
+        self.max_size = max_size or 2 * self.turn - 1
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+
+    def __len__(self):
+        return len(self._cache)
+
+    def get(self, angle):
+        """
+        Returns the sprite rotated by the given angle in degrees, along with the offset from the center of the object to
+        the top left corner of the rotated surface. The rotated surface can be bigger than the original sprite, so
+        the offset is half its size (see Spaceship.draw)
+        :returns: tuple of (rotated surface, blit offset)
+        """
+        key = round(angle / self.step)
+        cache = self._cache
+        rotated = cache.get(key)
+
+        if rotated is not None:
+            self.hits += 1
+            cache.move_to_end(key)
+            return rotated
+
+        self.misses += 1
+        rotated = self._render(key)
+        cache[key] = rotated
+        if len(cache) > self.max_size:
+            cache.popitem(last=False)
+
+        return rotated
+
+    def preload(self):
+        """
+        Renders every possible rotation up front, so that no rotation happens while the game is running
+        """
+        keys = range(1 - self.turn, self.turn)
+        for key in keys[:self.max_size]:
+            if key not in self._cache:
+                self._cache[key] = self._render(key)
+
+    def _render(self, key):
+        rotated_surface = rotozoom(self.sprite, key * self.step, 1.0)
+        return rotated_surface, Vector2(rotated_surface.get_size()) * 0.5
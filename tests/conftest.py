@@ -0,0 +1,31 @@
+"""
+The tests run the game the same way the benchmarks do: from the root of the repository, where the assets are, with the
+game directory on the path & SDL's dummy video & audio drivers.
+"""
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+sys.path.insert(0, os.path.join(ROOT, "game"))
+
+from utils.input_utils import ROTATE_RIGHT, SHOOT, THRUST  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def repository_root(monkeypatch):
+    # assets are loaded relative to the working directory
+    monkeypatch.chdir(ROOT)
+
+
+@pytest.fixture
+def actions():
+    """
+    A spaceship spinning on the spot & shooting all around it, with a little thrust now & then. It lives long enough to
+    split most of the asteroids, so there are plenty of collisions
+    """
+    return [ROTATE_RIGHT | (SHOOT if frame % 4 == 0 else 0) | (THRUST if frame % 90 < 6 else 0) for frame in range(900)]
@@ -0,0 +1,34 @@
+import pytest
+
+from models.world import World, np
+from space_rocks import SpaceRocks
+from utils.collision_utils import BruteForceBroadPhase, SpatialHashBroadPhase, SweepAndPruneBroadPhase
+from utils.input_utils import ScriptedInput
+
+# seeds where the spaceship survives for a good while
+SEEDS = (1, 2, 4, 7)
+
+# every way of finding the collisions has to play the exact same game as checking every asteroid one by one
+GAME_OPTIONS = {
+    "spatial hash": lambda: {"broad_phase": SpatialHashBroadPhase()},
+    "sweep & prune": lambda: {"broad_phase": SweepAndPruneBroadPhase()},
+    "pooling": lambda: {"pooling": True},
+    "world": lambda: {"world": World()},
+}
+
+
+def play(seed, actions, **game_options):
+    game = SpaceRocks(headless=True, seed=seed, input_source=ScriptedInput(actions), **game_options)
+    game.simulate(len(actions))
+    return game.get_state()
+
+
+@pytest.mark.parametrize("name", GAME_OPTIONS)
+def test_broad_phases_play_the_same_game(name, actions):
+    if name == "world" and np is None:
+        pytest.skip("the world requires numpy")
+
+    for seed in SEEDS:
+        expected = play(seed, actions, broad_phase=BruteForceBroadPhase())
+        assert expected["asteroids_destroyed"]
+        assert play(seed, actions, **GAME_OPTIONS[name]()) == expected, f"seed {seed}"
@@ -0,0 +1,11 @@
+import asyncio
+
+from lockstep import checksum, loopback
+
+
+def test_loopback_clients_stay_in_sync():
+    clients = asyncio.run(loopback(players=3, ticks=240, latency=0.08, seed=5))
+
+    assert len({checksum(client.game) for client in clients}) == 1
+    # with that much latency the clients have to roll back, which is what could make them drift apart
+    assert any(client.session.rollbacks for client in clients)
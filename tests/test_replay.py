@@ -0,0 +1,30 @@
+from replay import RecordingInput, Replay
+from space_rocks import SpaceRocks
+from utils.input_utils import ScriptedInput
+
+SEED = 7
+
+
+def test_replay_plays_the_recorded_game(tmp_path, actions):
+    path = str(tmp_path / "game.replay")
+    game = SpaceRocks(headless=True, seed=SEED)
+    recording = RecordingInput(ScriptedInput(actions), path, game, snapshot_interval=200)
+    game.input_source = recording
+    result = game.simulate(len(actions))
+    recording.close()
+
+    replay = Replay(path)
+    try:
+        assert len(replay) == result.frames
+        # playing the whole replay starts from its last snapshot
+        assert max(replay.snapshots) > 0
+        played, _ = replay.play()
+        assert played.get_state() == game.get_state()
+
+        # & playing up to a frame is the same as having played the game up to that frame
+        expected = SpaceRocks(headless=True, seed=SEED, input_source=ScriptedInput(actions))
+        expected.simulate(300)
+        played, _ = replay.play(300)
+        assert played.get_state() == expected.get_state()
+    finally:
+        replay.close()